@@ -0,0 +1,299 @@
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from multiprocessing import get_context
+
+import numpy as np
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for task in ('task02', 'task03', 'task04'):
+    sys.path.insert(0, os.path.join(root, task))
+
+import generator
+import interior
+import optimization_methods as om
+import primal_dual
+import revised
+import simplex
+import main as transportation
+
+# Every case runs in a fresh forked process, so a slow one can be stopped.
+# Instances come from a seeded generator outside the timed region; a case
+# is timed as the best of repeat runs, and its peak memory is what the
+# solver allocates on one more, traced run.
+# Iterations are the pivots or steps the LP solvers report, the cells the
+# transportation methods allocate and the pivots of the u-v method;
+# evaluations are the calls to f of the 1-D methods.
+
+
+# Instances
+def lp_instance(m, rng):
+    # Dense max C x s.t. A x <= b, x >= 0 with positive data: bounded, m
+    # constraints and m variables, and b > A 1 so the all-ones point the
+    # interior methods start from is strictly feasible
+    A = rng.uniform(1, 10, (m, m))
+    return {
+        'A': A,
+        'b': A.sum(axis=1) + rng.uniform(1, 10, m),
+        'C': rng.uniform(1, 10, m),
+        'is_max': True,
+    }
+
+
+def transportation_instance(m, rng):
+    # Balanced m x m table from the task03 generator
+    return generator.random_arrays(m, m, seed=int(rng.integers(2 ** 32)))
+
+
+def search_instance(k, rng):
+    # k unimodal functions cosh(x - c) + w (x - c)^2 on [-5, 5] and k
+    # monotone ones x^3 + x - p on [-5, 5], evaluated on the whole batch
+    return rng.uniform(-4, 4, k), rng.uniform(0, 1, k), rng.uniform(-100, 100, k)
+
+
+# Solvers: run(instance) -> (solved, iterations, evaluations); a solver
+# with a check(instance) has its last answer verified outside the timing
+def lp_solver(solve, reference=None):
+    # reference: a solver whose objective the answer has to match
+    def run(sample):
+        result = solve(sample)
+        run.objective = result[1]
+        return bool(result), result.iterations, None
+
+    def check(sample):
+        expected = reference(sample)
+        return bool(expected) and bool(np.isclose(run.objective, expected[1], rtol=1e-3, atol=1e-6))
+
+    if reference is not None:
+        run.check = check
+    return run
+
+
+def initial_solver(method):
+    def run(instance):
+        table = transportation.TransportationTable.from_arrays(*instance)
+        plan = method(table)
+        cells = np.count_nonzero(plan[0]) if plan else None
+        return bool(plan), cells, None
+
+    return run
+
+
+def optimal_solver(instance):
+    table = transportation.TransportationTable.from_arrays(*instance)
+    plan = transportation.optimal_transportation(table)
+    return bool(plan), plan.iterations, None
+
+
+def golden_solver(instance):
+    c, w, _ = instance
+    calls = [0]
+
+    def f(x):
+        calls[0] += 1
+        return np.cosh(x - c) + w * (x - c) ** 2
+
+    x_min, _ = om.golden_section_batch(f, -5, 5, 1e-8)
+    return bool(np.all(np.isfinite(x_min))), None, calls[0]
+
+
+def golden_loop_solver(instance):
+    # The scalar method called once per function, for comparison
+    c, w, _ = instance
+    calls = [0]
+    solved = True
+    for c_i, w_i in zip(c.tolist(), w.tolist()):
+        def f(x):
+            calls[0] += 1
+            return np.cosh(x - c_i) + w_i * (x - c_i) ** 2
+
+        solved &= bool(om.golden_section(f, -5, 5, 1e-8))
+    return solved, None, calls[0]
+
+
+def root_solver(method):
+    def run(instance):
+        _, _, p = instance
+        calls = [0]
+
+        def f(x):
+            calls[0] += 1
+            return x ** 3 + x - p
+
+        roots, iterations = om.bisection_batch(f, -5, 5, 1e-10, method=method)
+        return bool(np.all(np.isfinite(roots))), int(iterations.max()), calls[0]
+
+    return run
+
+
+suites = {
+    'lp': (lp_instance, [10, 50, 100, 500, 1000, 5000], {
+        'simplex': lp_solver(simplex.simplex),
+        'revised_simplex': lp_solver(revised.revised_simplex),
+        'interior_point': lp_solver(interior.interior_point, simplex.simplex),
+        'primal_dual': lp_solver(primal_dual.primal_dual, simplex.simplex),
+    }),
+    'transportation': (transportation_instance, [10, 100, 500, 1000, 5000], {
+        'north_west_corner': initial_solver(transportation.north_west_corner_method),
+        'vogel': initial_solver(transportation.vogel_approximation_method),
+        'russell': initial_solver(transportation.russel_approximation_method),
+        'optimal': optimal_solver,
+    }),
+    'search': (search_instance, [10, 1000, 100000], {
+        'golden_section': golden_loop_solver,
+        'golden_section_batch': golden_solver,
+        'bisection_batch': root_solver('bisection'),
+        'illinois_batch': root_solver('illinois'),
+    }),
+}
+
+
+def measure(suite, solver, size, seed, repeat, connection):
+    # Child side of a case; sends back its record
+    generate, _, solvers = suites[suite]
+    run = solvers[solver]
+    record = {'status': 'ok', 'time': np.inf, 'iterations': None, 'evaluations': None, 'peak_memory_mb': None}
+    try:
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            for _ in range(repeat):
+                instance = generate(size, np.random.default_rng(seed))
+                start = time.perf_counter()
+                solved, iterations, evaluations = run(instance)
+                record['time'] = min(record['time'], time.perf_counter() - start)
+        record['iterations'] = None if iterations is None else int(iterations)
+        record['evaluations'] = evaluations
+        if not solved:
+            record['status'] = 'failed'
+        elif hasattr(run, 'check') and not run.check(instance):
+            record['status'] = 'wrong'
+
+        # Tracing slows the solver down, so the timed runs are not traced;
+        # the instance is allocated before the trace starts
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            tracemalloc.start()
+            try:
+                run(instance)
+                record['peak_memory_mb'] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            finally:
+                tracemalloc.stop()
+    except Exception as error:
+        record['status'] = f'error: {error!r}'
+        record['time'] = None
+    connection.send(record)
+
+
+def run_case(suite, solver, size, seed=0, repeat=3, timeout=60.0) -> dict:
+    context = get_context('fork')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=measure, args=(suite, solver, size, seed, repeat, sender))
+    process.start()
+    sender.close()
+    if receiver.poll(timeout):
+        record = receiver.recv()
+    else:
+        record = {'status': 'timeout', 'time': None, 'iterations': None, 'evaluations': None,
+                  'peak_memory_mb': None}
+        process.terminate()
+    process.join()
+    receiver.close()
+    return record
+
+
+def run_benchmarks(names=None, sizes=None, seed=0, repeat=3, timeout=60.0):
+    # Records keyed 'suite/solver/size'; a solver that timed out is not
+    # run at the larger sizes of its sweep
+    for suite in names or suites:
+        _, default_sizes, solvers = suites[suite]
+        for solver in solvers:
+            for size in sizes or default_sizes:
+                key = f"{suite}/{solver}/{size}"
+                record = run_case(suite, solver, size, seed, repeat, timeout)
+                yield key, record
+                if record['status'] == 'timeout':
+                    break
+
+
+def regressions(records, baseline, tolerance=0.25, min_time=0.005, min_memory=1.0) -> list:
+    # Slower or larger than the baseline by more than tolerance (and the
+    # absolute noise floors), more iterations or evaluations on the same
+    # seeded instance, or a case that no longer solves. Measurements are
+    # only compared between two 'ok' runs.
+    found = []
+    for key, record in records.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        if old['status'] == 'ok' and record['status'] != 'ok':
+            found.append((key, 'status', old['status'], record['status']))
+        if old['status'] != 'ok' or record['status'] != 'ok':
+            continue
+        if record['time'] > old['time'] * (1 + tolerance) and record['time'] - old['time'] > min_time:
+            found.append((key, 'time', old['time'], record['time']))
+        for field in ('iterations', 'evaluations'):
+            if old[field] is not None and record[field] is not None and record[field] > old[field]:
+                found.append((key, field, old[field], record[field]))
+        if old.get('peak_memory_mb') is not None and record['peak_memory_mb'] is not None \
+                and record['peak_memory_mb'] > old['peak_memory_mb'] * (1 + tolerance) \
+                and record['peak_memory_mb'] - old['peak_memory_mb'] > min_memory:
+            found.append((key, 'peak_memory_mb', old['peak_memory_mb'], record['peak_memory_mb']))
+    return found
+
+
+def improvements(records, baseline) -> list:
+    # Cases that failed, errored or timed out in the baseline and now solve
+    return [(key, 'status', baseline[key]['status'], record['status'])
+            for key, record in records.items()
+            if key in baseline and baseline[key]['status'] != 'ok' and record['status'] == 'ok']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seeded size sweeps of the solvers against a JSON baseline")
+    parser.add_argument('--suites', nargs='+', choices=list(suites), default=list(suites))
+    parser.add_argument('--sizes', nargs='+', type=int, help="sizes for every selected suite")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=60.0, help="seconds per case")
+    parser.add_argument('--baseline', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json'))
+    parser.add_argument('--update', action='store_true', help="write the results into the baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    elif not args.update:
+        print(f"Warning: no baseline at {args.baseline}, nothing is checked for regressions; "
+              f"--update records one")
+
+    records = {}
+    for key, record in run_benchmarks(args.suites, args.sizes, args.seed, args.repeat, args.timeout):
+        records[key] = record
+        elapsed = '-' if record['time'] is None else f"{record['time']:.4f} s"
+        memory = '-' if record['peak_memory_mb'] is None else f"{record['peak_memory_mb']:.2f} MB"
+        print(f"{key:45} {record['status']:8} {elapsed:>12}  iterations={record['iterations']}  "
+              f"evaluations={record['evaluations']}  memory={memory}")
+
+    missing = [key for key in records if key not in baseline]
+    if baseline and missing and not args.update:
+        print(f"Warning: {len(missing)} cases have no baseline and are not checked: {', '.join(missing)}")
+
+    found = regressions(records, baseline, args.tolerance)
+    for key, field, old, new in found:
+        print(f"Regression in {key}: {field} {old} -> {new}")
+    for key, field, old, new in improvements(records, baseline):
+        print(f"Improvement in {key}: {field} {old} -> {new}")
+
+    if args.update:
+        baseline.update(records)
+        with open(args.baseline, 'w') as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+    return 1 if found and not args.update else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+from scipy import sparse
+
+# The solution store behind task02/cache.py and task03/cache.py, which add
+# this directory to sys.path and only know how to key and serialize their
+# own problems.
+
+
+class SolutionCache:
+    # Content-addressed store of solutions. A key is a digest of the problem
+    # in canonical form with the solver and its options, an entry a dict of
+    # arrays. The memory tier keeps the most recently used entries within
+    # max_entries and max_bytes. With a directory every entry is also
+    # written there as .npy files, and a miss in memory is looked up on disk
+    # and loaded memory-mapped, so the tier outlives the process and is
+    # shared by every process using the directory. Cached arrays are
+    # read-only.
+    def __init__(self, max_entries=128, max_bytes=None, directory=None):
+        self.entries = OrderedDict()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self.hits, self.disk_hits, self.misses = 0, 0, 0
+
+    def get(self, key):
+        # The entry of key, None on a miss
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        entry = self.load(key) if self.directory is not None else None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.disk_hits += 1
+        self.remember(key, entry)
+        return entry
+
+    def put(self, key, entry):
+        for values in entry.values():
+            values.flags.writeable = False
+        self.remember(key, entry)
+        if self.directory is not None:
+            self.store(key, entry)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self.entries),
+            'bytes': self.nbytes,
+        }
+
+    def clear(self):
+        # Empties the memory tier; the directory is left alone
+        self.entries.clear()
+        self.nbytes = 0
+
+    def remember(self, key, entry):
+        self.entries[key] = entry
+        self.nbytes += entry_bytes(entry)
+        while len(self.entries) > 1 and (len(self.entries) > self.max_entries or
+                                         self.max_bytes is not None and self.nbytes > self.max_bytes):
+            _, evicted = self.entries.popitem(last=False)
+            self.nbytes -= entry_bytes(evicted)
+
+    def store(self, key, entry):
+        # Written to a temporary directory and renamed, so readers never see
+        # half an entry; when another process stored it first, its copy stays
+        path = os.path.join(self.directory, key)
+        if os.path.isdir(path):
+            return
+        staging = tempfile.mkdtemp(dir=self.directory, prefix='.staging-')
+        for name, values in entry.items():
+            np.save(os.path.join(staging, f'{name}.npy'), values)
+        try:
+            os.rename(staging, path)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def load(self, key):
+        path = os.path.join(self.directory, key)
+        if not os.path.isdir(path):
+            return None
+        return {name[:-4]: np.load(os.path.join(path, name), mmap_mode='r')
+                for name in os.listdir(path) if name.endswith('.npy')}
+
+
+def solver_digest(*solvers):
+    # A new digest of a key, started with the solvers that made the answer
+    digest = hashlib.blake2b(digest_size=20)
+    for solver in solvers:
+        digest.update(f"{solver.__module__}.{solver.__qualname__}".encode())
+    return digest
+
+
+def update_array(digest, values):
+    # Shape and canonical values, so the same numbers in another layout or
+    # width agree
+    values = np.asarray(values)
+    digest.update(b'array' + repr(values.shape).encode())
+    digest.update(canonical(values).tobytes())
+
+
+def update_sparse(digest, matrix):
+    # Sorted CSR form, so the same entries in any sparse format agree; a
+    # CSR input shares its arrays, so it is only sorted on a copy
+    matrix = sparse.csr_matrix(matrix)
+    if not matrix.has_canonical_format:
+        matrix = matrix.copy()
+        matrix.sum_duplicates()
+    digest.update(b'csr' + repr(matrix.shape).encode())
+    for values in (matrix.data, matrix.indices, matrix.indptr):
+        digest.update(canonical(values).tobytes())
+
+
+# Utility functions
+def canonical(values) -> np.ndarray:
+    # Integers as int64, anything else as float64 without negative zeros
+    values = np.asarray(values)
+    if values.dtype.kind in 'biu':
+        return np.ascontiguousarray(values, dtype=np.int64)
+    return np.ascontiguousarray(values, dtype=float) + 0.0
+
+
+def entry_bytes(entry: dict) -> int:
+    return sum(values.nbytes for values in entry.values())
@@ -0,0 +1,32 @@
+# The status carrier returned by the solvers of task02, task03 and task04,
+# which add this directory to sys.path and subclass Result with their own
+# solved statuses and messages.
+
+
+class Result(tuple):
+    # Two values of a solve (a solution and its objective value, a plan and
+    # its cost, a point and its function value) that unpack like the plain
+    # tuples the solvers used to return, with the status and the number of
+    # iterations attached. Only a status in solved makes a result truthy;
+    # an unsolved one has None for both values. message is the text a demo
+    # prints for the status.
+    solved = ('optimal',)
+    messages = {}
+
+    def __new__(cls, first=None, second=None, status=None, iterations=0):
+        result = super().__new__(cls, (first, second))
+        result.status = cls.solved[0] if status is None else status
+        result.iterations = iterations
+        return result
+
+    def __getnewargs__(self):
+        # Unpickled as __new__(cls, first, second), the status and the rest
+        # come back with the instance dict
+        return tuple(self)
+
+    def __bool__(self):
+        return self.status in self.solved
+
+    @property
+    def message(self):
+        return self.messages.get(self.status, self.status)
@@ -0,0 +1,553 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import deque
+from multiprocessing import get_context, resource_tracker
+
+import numpy as np
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for task in ('task02', 'task03'):
+    sys.path.insert(0, os.path.join(root, task))
+
+import interior
+import primal_dual
+import revised
+import simplex
+from batch import solve_batch
+from generator import load_instance
+from main import (TransportationTable, north_west_corner_method, optimal_transportation, russel_approximation_method,
+                  vogel_approximation_method)
+from runner import attach, share
+
+# Local solve service. Clients send one JSON object per line and get one
+# back per line:
+#   {"op": "solve", "id": 7, "kind": "lp", "method": "simplex", "timeout": 5,
+#    "problem": {"A": [[...]], "b": [...], "C": [...], "is_max": true}}
+#   {"op": "solve", "id": 8, "kind": "transportation", "method": "optimal",
+#    "problem": {"costs": [[...]], "supplies": [...], "demands": [...]}}
+#   {"op": "cancel", "id": 7}
+#   {"op": "stats", "id": 9}
+# An array can also be {"path": "file.npy"} and a transportation problem
+# {"instance": directory} as written by generator.write_instance; workers
+# memory-map those. Replies to solves stream back as the jobs finish, in
+# any order, as {"id", "status", "latency", "batch", ...} with the status
+# of the solve or 'timeout', 'cancelled' or 'error'.
+#
+# Jobs run on a fixed set of worker processes. A job that times out or is
+# cancelled while running has its worker killed and replaced. Small jobs
+# of one method and shape arriving within window seconds of each other go
+# to a worker together (LP ones solved by batch.solve_batch), and inline
+# arrays of share_threshold bytes or more reach the worker through shared
+# memory instead of the pipe.
+
+default_socket = os.path.join(tempfile.gettempdir(), 'optimization.sock')
+
+# Longest message line, in bytes, either way
+max_message = 1 << 28
+
+lp_solvers = {
+    'simplex': simplex.simplex,
+    'revised_simplex': revised.revised_simplex,
+    'interior_point': interior.interior_point,
+    'primal_dual': primal_dual.primal_dual,
+}
+
+# LP methods batch.solve_batch can stack, with its names for them
+batch_methods = {'simplex': 'simplex', 'interior_point': 'interior'}
+
+transportation_methods = {
+    'north_west_corner': north_west_corner_method,
+    'vogel': vogel_approximation_method,
+    'russell': russel_approximation_method,
+    'optimal': optimal_transportation,
+}
+
+array_fields = {
+    'lp': ('A', 'b', 'C'),
+    'transportation': ('costs', 'supplies', 'demands'),
+}
+
+
+class Job:
+    def __init__(self, id, kind, method, problem, timeout=None):
+        self.id = id
+        self.kind = kind
+        self.method = method
+        self.problem = problem
+        self.timeout = timeout
+        self.future = asyncio.get_running_loop().create_future()
+        self.submitted = time.perf_counter()
+        self.state = 'waiting'
+        self.batch_size = 1
+        self.timer = None
+
+
+class Worker:
+    # One process running calls sent over a pipe; the event loop waits for
+    # its answer without a thread
+    def __init__(self, context):
+        self.context = context
+        self.start()
+
+    def start(self):
+        self.connection, child = self.context.Pipe()
+        self.process = self.context.Process(target=serve_worker, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    def stop(self):
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+    async def call(self, function, *args):
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        fd = self.connection.fileno()
+        loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+        try:
+            try:
+                self.connection.send((function, args))
+                await ready
+            finally:
+                loop.remove_reader(fd)
+            status, value = self.connection.recv()
+        except asyncio.CancelledError:
+            # The call is abandoned, the process may be mid-solve
+            self.restart()
+            raise
+        except (EOFError, BrokenPipeError):
+            self.restart()
+            raise RuntimeError("worker process died") from None
+        if status == 'error':
+            raise RuntimeError(value)
+        return value
+
+
+class Service:
+    def __init__(self, processes=None, window=0.002, max_batch=64, small=10000, share_threshold=1 << 20,
+                 timeout=None):
+        self.processes = processes or os.cpu_count()
+        self.window = window
+        self.max_batch = max_batch
+        self.small = small
+        self.share_threshold = share_threshold
+        self.timeout = timeout
+
+        self.queue = asyncio.Queue()  # lists of jobs ready for a worker
+        self.open = {}  # batch key -> jobs waiting for the window to close
+        self.waiting, self.running = 0, 0
+        self.latencies = deque(maxlen=10000)
+        self.counts = {'completed': 0, 'timeout': 0, 'cancelled': 0, 'error': 0}
+        self.workers, self.dispatchers = [], []
+
+    async def start(self):
+        # Workers are forked after the resource tracker is up, so they share
+        # it and do not unlink the blocks they attach to (see runner.attach)
+        resource_tracker.ensure_running()
+        context = get_context('fork')
+        self.workers = [Worker(context) for _ in range(self.processes)]
+        self.dispatchers = [asyncio.create_task(self.dispatch(worker)) for worker in self.workers]
+
+    async def close(self):
+        for dispatcher in self.dispatchers:
+            dispatcher.cancel()
+        await asyncio.gather(*self.dispatchers, return_exceptions=True)
+        for worker in self.workers:
+            worker.stop()
+
+    def job(self, message) -> Job:
+        # A Job from a solve message; ValueError, KeyError or TypeError when
+        # it is malformed
+        kind, method = message['kind'], message['method']
+        methods = lp_solvers if kind == 'lp' else transportation_methods if kind == 'transportation' else None
+        if methods is None or method not in methods:
+            raise ValueError(f"unknown {kind!r} method {method!r}")
+
+        problem = dict(message['problem'])
+        for field in array_fields[kind]:
+            values = problem.get(field)
+            if isinstance(values, list):
+                problem[field] = np.asarray(values)
+        timeout = message.get('timeout', self.timeout)
+        return Job(message.get('id'), kind, method, problem, timeout)
+
+    def submit(self, job: Job):
+        loop = asyncio.get_running_loop()
+        self.waiting += 1
+        job.future.add_done_callback(lambda _: self.finished(job))
+        if job.timeout is not None:
+            job.timer = loop.call_later(job.timeout, expire, job)
+
+        key = batch_key(job, self.small)
+        if key is None:
+            self.queue.put_nowait([job])
+            return
+        jobs = self.open.setdefault(key, [])
+        jobs.append(job)
+        if len(jobs) == 1:
+            loop.call_later(self.window, self.flush, key)
+        if len(jobs) >= self.max_batch:
+            self.flush(key)
+
+    def flush(self, key):
+        jobs = self.open.pop(key, None)
+        if jobs:
+            self.queue.put_nowait(jobs)
+
+    def finished(self, job: Job):
+        if job.state == 'waiting':
+            self.waiting -= 1
+        elif job.state == 'running':
+            self.running -= 1
+        job.state = 'done'
+        if job.timer:
+            job.timer.cancel()
+
+        if job.future.cancelled():
+            self.counts['cancelled'] += 1
+        elif isinstance(job.future.exception(), TimeoutError):
+            self.counts['timeout'] += 1
+        elif job.future.exception() is not None:
+            self.counts['error'] += 1
+        else:
+            self.counts['completed'] += 1
+            self.latencies.append(time.perf_counter() - job.submitted)
+
+    async def dispatch(self, worker: Worker):
+        # Feeds one worker; a batch whose jobs were all cancelled or timed
+        # out is abandoned, which kills the worker
+        while True:
+            jobs = [job for job in await self.queue.get() if not job.future.done()]
+            if not jobs:
+                continue
+            for job in jobs:
+                job.state = 'running'
+                job.batch_size = len(jobs)
+            self.waiting -= len(jobs)
+            self.running += len(jobs)
+
+            block, layout, problems = self.pack(jobs)
+            run = asyncio.ensure_future(worker.call(solve_jobs, jobs[0].kind, jobs[0].method, problems,
+                                                    block and block.name, layout))
+
+            def abandon(_):
+                if all(job.future.done() for job in jobs):
+                    run.cancel()
+
+            for job in jobs:
+                job.future.add_done_callback(abandon)
+            try:
+                await asyncio.wait({run})
+            finally:
+                if not run.done():
+                    # The service is closing
+                    run.cancel()
+                    await asyncio.wait({run})
+                if block:
+                    block.close()
+                    block.unlink()
+
+            if run.cancelled():
+                continue
+            error = run.exception()
+            for k, job in enumerate(jobs):
+                if job.future.done():
+                    continue
+                if error is None:
+                    job.future.set_result(run.result()[k])
+                else:
+                    job.future.set_exception(error)
+
+    def pack(self, jobs) -> tuple:
+        # Problems for the pipe, large arrays swapped for {'shared': index}
+        # into one shared memory block of the batch
+        arrays, problems = [], []
+        for job in jobs:
+            problem = dict(job.problem)
+            for field in array_fields[job.kind]:
+                values = problem.get(field)
+                if isinstance(values, np.ndarray) and values.nbytes >= self.share_threshold:
+                    problem[field] = {'shared': len(arrays)}
+                    arrays.append(np.ascontiguousarray(values))
+            problems.append(problem)
+        if not arrays:
+            return None, None, problems
+        block, layout = share(arrays)
+        return block, layout, problems
+
+    def stats(self) -> dict:
+        # Queue depth counts the jobs not on a worker yet; latencies, from
+        # submission to the answer, are over the last completed jobs
+        latency = None
+        if self.latencies:
+            p50, p90, p99 = np.percentile(self.latencies, [50, 90, 99])
+            latency = {'p50': p50, 'p90': p90, 'p99': p99, 'max': max(self.latencies)}
+        return {'queue_depth': self.waiting, 'running': self.running, 'workers': len(self.workers),
+                'latency': latency, **self.counts}
+
+    async def handle(self, reader, writer):
+        # One client connection; replies go out as the jobs finish, and the
+        # jobs still pending when the client goes away are cancelled
+        jobs, replies = {}, set()
+        ids = itertools.count()
+        try:
+            while line := await reader.readline():
+                message = {}
+                try:
+                    message = json.loads(line)
+                    op = message.get('op', 'solve')
+                    if op == 'solve':
+                        message.setdefault('id', f'job-{next(ids)}')
+                        job = self.job(message)
+                        jobs[job.id] = job
+                        self.submit(job)
+                        reply = asyncio.create_task(self.reply(writer, job, jobs))
+                        replies.add(reply)
+                        reply.add_done_callback(replies.discard)
+                    elif op == 'cancel':
+                        if message['id'] in jobs:
+                            jobs[message['id']].future.cancel()
+                    elif op == 'stats':
+                        send(writer, {'id': message.get('id'), 'stats': self.stats()})
+                    else:
+                        raise ValueError(f"unknown op {op!r}")
+                except (ValueError, KeyError, TypeError, AttributeError) as error:
+                    send(writer, {'id': message.get('id') if isinstance(message, dict) else None,
+                                  'status': 'error', 'error': str(error)})
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for job in list(jobs.values()):
+                job.future.cancel()
+            await asyncio.gather(*replies, return_exceptions=True)
+            writer.close()
+
+    async def reply(self, writer, job: Job, jobs: dict):
+        await asyncio.wait({job.future})
+        jobs.pop(job.id, None)
+        reply = {'id': job.id, 'latency': time.perf_counter() - job.submitted, 'batch': job.batch_size}
+        if job.future.cancelled():
+            reply['status'] = 'cancelled'
+        elif isinstance(job.future.exception(), TimeoutError):
+            reply['status'] = 'timeout'
+        elif job.future.exception() is not None:
+            reply.update(status='error', error=str(job.future.exception()))
+        else:
+            reply.update(job.future.result())
+        if not writer.is_closing():
+            send(writer, reply)
+
+
+class Client:
+    # Connection to the service; solve() can be awaited from many tasks at
+    # once and each returns its reply as soon as the job finishes
+    def __init__(self, reader, writer):
+        self.reader, self.writer = reader, writer
+        self.pending = {}
+        self.ids = itertools.count()
+        self.listener = asyncio.create_task(self.listen())
+
+    @classmethod
+    async def connect(cls, path=None, host=None, port=None):
+        if port is None:
+            reader, writer = await asyncio.open_unix_connection(path or default_socket, limit=max_message)
+        else:
+            reader, writer = await asyncio.open_connection(host or 'localhost', port, limit=max_message)
+        return cls(reader, writer)
+
+    async def solve(self, kind, method, problem, timeout=None, id=None) -> dict:
+        # numpy arrays in problem are sent inline; large ones are better
+        # saved to .npy and given as {'path': ...}
+        message = {'op': 'solve', 'kind': kind, 'method': method, 'problem': problem}
+        if timeout is not None:
+            message['timeout'] = timeout
+        return await self.request(message, id)
+
+    async def cancel(self, id):
+        send(self.writer, {'op': 'cancel', 'id': id})
+        await self.writer.drain()
+
+    async def stats(self) -> dict:
+        return (await self.request({'op': 'stats'}))['stats']
+
+    async def request(self, message, id=None) -> dict:
+        message['id'] = f'request-{next(self.ids)}' if id is None else id
+        future = asyncio.get_running_loop().create_future()
+        self.pending[message['id']] = future
+        try:
+            send(self.writer, message)
+            await self.writer.drain()
+            return await future
+        finally:
+            self.pending.pop(message['id'], None)
+
+    async def listen(self):
+        while line := await self.reader.readline():
+            reply = json.loads(line)
+            future = self.pending.pop(reply.get('id'), None)
+            if future is not None and not future.done():
+                future.set_result(reply)
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("the service closed the connection"))
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        await asyncio.gather(self.listener, return_exceptions=True)
+
+
+def batch_key(job: Job, small) -> tuple:
+    # Jobs with the same key can share a worker call; None for a job that
+    # runs alone. LP jobs are stacked by solve_batch, which only covers
+    # dense A x <= b problems.
+    problem = job.problem
+    if job.kind == 'lp':
+        if job.method not in batch_methods or set(problem) != {'A', 'b', 'C', 'is_max'}:
+            return None
+        A, b = problem['A'], problem['b']
+        if not isinstance(A, np.ndarray) or not isinstance(b, np.ndarray) or A.ndim != 2 or A.size > small:
+            return None
+        return 'lp', job.method, A.shape
+
+    costs = problem.get('costs')
+    if not isinstance(costs, np.ndarray) or costs.ndim != 2 or costs.size > small:
+        return None
+    return 'transportation', job.method, costs.shape
+
+
+def solve_jobs(kind, method, problems, name=None, layout=None) -> list:
+    # Worker side of a batch: the replies of the problems in order. Replies
+    # are plain lists, so nothing keeps a view of the shared block.
+    block, arrays = attach(name, layout) if name else (None, [])
+    try:
+        problems = [unpack(problem, arrays) for problem in problems]
+        if kind == 'lp':
+            if len(problems) > 1:
+                results = solve_batch(problems, batch_methods[method])
+                return [lp_reply(result) for result in results]
+            return [respond(lambda: lp_reply(lp_solvers[method](problems[0])))]
+        return [respond(lambda: transportation_reply(method, problem)) for problem in problems]
+    finally:
+        problems = arrays = None
+        if block:
+            block.close()
+
+
+def serve_worker(connection):
+    # Worker process: runs (function, args) calls until the pipe closes
+    while True:
+        try:
+            function, args = connection.recv()
+        except EOFError:
+            return
+        try:
+            connection.send(('ok', function(*args)))
+        except Exception as error:
+            connection.send(('error', repr(error)))
+
+
+def lp_reply(result) -> dict:
+    return {
+        'status': result.status,
+        'objective': None if result[1] is None else float(result[1]),
+        'solution': [[int(i), float(value)] for i, value in result[0] or []],
+        'iterations': int(result.iterations),
+        'basis': None if result.basis is None else np.asarray(result.basis).tolist(),
+    }
+
+
+def transportation_reply(method, problem) -> dict:
+    # The status of the method's plan with its iterations, and the cost and
+    # the plan when it has one
+    table = TransportationTable.from_arrays(problem['costs'], problem['supplies'], problem['demands'])
+    plan = transportation_methods[method](table)
+    reply = {'status': plan.status, 'iterations': int(plan.iterations)}
+    if plan:
+        reply['cost'] = np.asarray(plan[1]).item()
+        reply['allocation'] = np.asarray(plan[0]).tolist()
+    return reply
+
+
+def serve(args):
+    async def run():
+        service = Service(args.processes, args.window, args.max_batch, args.small, args.share_threshold, args.timeout)
+        await service.start()
+        if args.port is None:
+            server = await asyncio.start_unix_server(service.handle, args.socket, limit=max_message)
+        else:
+            server = await asyncio.start_server(service.handle, args.host, args.port, limit=max_message)
+        print(f"Serving on {args.socket if args.port is None else f'{args.host}:{args.port}'} "
+              f"with {service.processes} workers")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await service.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local service solving LP and transportation jobs")
+    parser.add_argument('--socket', default=default_socket, help="Unix socket to listen on")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, help="listen on TCP instead of the Unix socket")
+    parser.add_argument('--processes', type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument('--window', type=float, default=0.002, help="seconds small jobs wait for a batch")
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--small', type=int, default=10000, help="largest matrix size that is batched")
+    parser.add_argument('--share-threshold', type=int, default=1 << 20,
+                        help="bytes from which arrays go through shared memory")
+    parser.add_argument('--timeout', type=float, help="default seconds per job")
+    serve(parser.parse_args())
+
+
+# Utility functions
+def send(writer, message):
+    writer.write(json.dumps(message, default=lambda value: value.tolist()).encode() + b'\n')
+
+
+def expire(job: Job):
+    if not job.future.done():
+        job.future.set_exception(TimeoutError(f"job {job.id} timed out"))
+
+
+def respond(solve) -> dict:
+    # One problem's reply; a failure does not take the batch down with it
+    try:
+        return solve()
+    except Exception as error:
+        return {'status': 'error', 'error': repr(error)}
+
+
+def unpack(problem, arrays) -> dict:
+    # Arrays from the shared block or memory-mapped from disk
+    problem = dict(problem)
+    if 'instance' in problem:
+        problem['costs'], problem['supplies'], problem['demands'] = load_instance(problem.pop('instance'))
+    for field, values in problem.items():
+        if isinstance(values, dict) and 'shared' in values:
+            problem[field] = arrays[values['shared']]
+        elif isinstance(values, dict) and 'path' in values:
+            problem[field] = np.load(values['path'], mmap_mode='r')
+    return problem
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+import numpy as np
+
+from interior import affine_step, stacked_projection
+from result import Result
+from simplex import simplex
+
+
+# Solve many LPs at once. Problems of the same shape are stacked into 3-D
+# arrays and iterated together with broadcasted NumPy operations; finished
+# problems drop out of the active set. Results come back in input order as
+# Result objects. An observer is called once per iteration of every group
+# with the number of problems still active. For the simplex, problems with
+# some b_i < 0 have no feasible all-slack start and are solved one by one
+# by simplex(), which takes its two-phase path.
+def solve_batch(samples, method='interior', max_iterations=10000, observer=None):
+    solvers = {
+        'interior': batch_interior_point,
+        'simplex': batch_simplex,
+    }
+    solver = solvers[method]
+
+    results = [None] * len(samples)
+    groups = {}
+    for k, sample in enumerate(samples):
+        if method == 'simplex' and np.any(np.array(sample['b'], float) < 0):
+            results[k] = simplex(sample)
+            continue
+        shape = (len(sample['b']), len(sample['C']))
+        groups.setdefault(shape, []).append(k)
+
+    for indexes in groups.values():
+        A = np.array([samples[k]['A'] for k in indexes], float)
+        b = np.array([samples[k]['b'] for k in indexes], float)
+        C = np.array([samples[k]['C'] for k in indexes], float)
+        is_max = np.array([samples[k]['is_max'] for k in indexes], bool)
+        for k, result in zip(indexes, solver(A, b, C, is_max, max_iterations, observer)):
+            results[k] = result
+
+    return results
+
+
+# Affine scaling as in interior.interior_point, over a (K, N, M) stack:
+# the same start, normal matrices, Cholesky test and status checks for
+# every problem
+def batch_interior_point(A, b, C, is_max, max_iterations=10000, observer=None):
+    alpha = 0.5
+    accuracy = 0.0001
+
+    K, N, M = A.shape
+    sign = np.where(is_max, 1.0, -1.0)[:, None]
+
+    x = np.concatenate((np.ones((K, M)), b - A.sum(axis=2)), axis=1)
+    c = np.concatenate((C, np.zeros((K, N))), axis=1) * sign
+    iterations = np.zeros(K, int)
+
+    # The method moves inside x > 0 only, so the slacks at x = 1 must be positive
+    status = np.where(np.any(x <= 0, axis=1), 'not applicable', 'optimal').astype(object)
+    active = np.flatnonzero(status == 'optimal')
+
+    for i in range(1, max_iterations + 1):
+        if active.size == 0:
+            break
+        iterations[active] = i
+
+        xa = x[active]
+        cp, unbounded = stacked_projection(A[active], xa, c[active])
+
+        # Unbounded as in interior_point: a normal matrix that is not finite
+        # or not positive definite, or no negative component in cp (unless
+        # cp is zero and the point is already optimal)
+        nonnegative = ~unbounded & np.all(cp >= 0, axis=1)
+        unbounded |= nonnegative & np.any(cp > 0, axis=1)
+        status[active[unbounded]] = 'unbounded'
+
+        keep = ~unbounded & ~nonnegative
+        x_new = affine_step(xa[keep], cp[keep], alpha)
+        converged = np.linalg.norm(x_new - xa[keep], axis=-1) < accuracy
+
+        x[active[keep]] = x_new
+        active = active[keep][~converged]
+        if observer:
+            observer({'iteration': i, 'active': active.size})
+
+    status[active] = 'iteration limit'
+
+    return [Result(filter_solution(x[k, :M], accuracy), np.dot(c[k], x[k]) * sign[k, 0], iterations=int(iterations[k]))
+            if status[k] == 'optimal' else Result(status=status[k], iterations=int(iterations[k]))
+            for k in range(K)]
+
+
+# Tableau pivoting as in simplex.simplex, over a (K, N+1, N+M+1) stack
+def batch_simplex(A, b, C, is_max, max_iterations=10000, observer=None):
+    eps = 0.0001
+
+    K, N, M = A.shape
+    tableau = np.zeros((K, N + 1, N + M + 1))
+    tableau[:, 0, :M] = np.where(is_max[:, None], -C, C)
+    tableau[:, 1:, :M] = A
+    tableau[:, 1:, -1] = b
+    tableau[:, np.arange(1, N + 1), np.arange(M, M + N)] = 1
+
+    basis = np.tile(np.arange(M, M + N), (K, 1))
+
+    # The all-slack starting basis has to be feasible
+    status = np.where(np.any(b < 0, axis=1), 'not applicable', 'optimal').astype(object)
+    active = np.where(status == 'optimal')[0]
+    iterations = np.zeros(K, int)
+
+    for i in range(1, max_iterations + 1):
+        active = active[np.any(tableau[active, 0, :-1] < -eps, axis=1)]
+        if active.size == 0:
+            break
+        iterations[active] = i
+
+        T = tableau[active]
+        rows = np.arange(active.size)
+        pivot_col = np.argmin(T[:, 0, :-1], axis=1)
+
+        # Ratio test over rows with a positive pivot element
+        col = T[rows, 1:, pivot_col]
+        positive = col > eps
+        ratios = np.full(col.shape, np.inf)
+        ratios[positive] = T[:, 1:, -1][positive] / col[positive]
+
+        unbounded = np.all(np.isinf(ratios), axis=1)
+        status[active[unbounded]] = 'unbounded'
+
+        # Among tied rows take the largest pivot element
+        go = ~unbounded
+        T, rows, pivot_col, col = T[go], np.arange(np.count_nonzero(go)), pivot_col[go], col[go]
+        ties = ratios[go] - np.min(ratios[go], axis=1)[:, None] <= eps
+        pivot_row = np.argmax(np.where(ties, col, -np.inf), axis=1) + 1
+
+        pivot_line = T[rows, pivot_row] / T[rows, pivot_row, pivot_col][:, None]
+        T -= T[rows, :, pivot_col][:, :, None] * pivot_line[:, None, :]
+        T[rows, pivot_row] = pivot_line
+
+        tableau[active[go]] = T
+        active = active[go]
+        basis[active, pivot_row - 1] = pivot_col
+        if observer:
+            observer({'iteration': i, 'active': active.size})
+    else:
+        status[active] = 'iteration limit'
+
+    # Solution extraction
+    solution = np.zeros((K, M + N))
+    np.put_along_axis(solution, basis, tableau[:, 1:, -1], axis=1)
+    solution = solution[:, :M]
+
+    return [Result(filter_solution(solution[k], eps), tableau[k, 0, -1], iterations=int(iterations[k]),
+                   basis=basis[k].copy())
+            if status[k] == 'optimal' else Result(status=status[k], iterations=int(iterations[k]))
+            for k in range(K)]
+
+
+# Utility functions
+def filter_solution(x, accuracy):
+    return [(i, sol) for (i, sol) in list(enumerate(x)) if abs(sol) > accuracy]
@@ -0,0 +1,80 @@
+import json
+import os
+import sys
+
+import numpy as np
+from scipy import sparse
+
+from result import Result
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common'))
+
+from solution_cache import SolutionCache, solver_digest, update_array, update_sparse
+
+
+def cached(solver, cache: SolutionCache, **options):
+    # solver(sample, **options) behind the cache. A hit returns the stored
+    # Result, basis included, without calling the solver (or the observer).
+    def solve(sample, observer=None):
+        key = sample_key(sample, solver, options)
+        entry = cache.get(key)
+        if entry is not None:
+            return result_from(entry)
+
+        result = solver(sample, observer=observer, **options)
+        cache.put(key, result_entry(result))
+        return result
+
+    solve.cache = cache
+    return solve
+
+
+def sample_key(sample, solver, options) -> str:
+    # Digest of every key of the sample, numbers as float64 so lists and
+    # arrays of any dtype with the same values agree, with the solver and
+    # its options
+    digest = solver_digest(solver)
+    digest.update(json.dumps(options, sort_keys=True, default=repr).encode())
+    for name in sorted(sample):
+        digest.update(name.encode())
+        update_digest(digest, sample[name])
+    return digest.hexdigest()
+
+
+def result_entry(result: Result) -> dict:
+    filtered = result[0] or []
+    entry = {
+        'status': np.array(result.status),
+        'iterations': np.array(result.iterations),
+        'indexes': np.array([i for i, _ in filtered], dtype=np.int64),
+        'values': np.array([value for _, value in filtered], dtype=float),
+    }
+    if result[1] is not None:
+        entry['objective'] = np.array(result[1], dtype=float)
+    if getattr(result, 'basis', None) is not None:
+        entry['basis'] = np.array(result.basis)
+    return entry
+
+
+def result_from(entry: dict) -> Result:
+    status = str(entry['status'][()])
+    iterations = int(entry['iterations'][()])
+    if status != 'optimal':
+        return Result(status=status, iterations=iterations)
+    filtered = list(zip(entry['indexes'].tolist(), entry['values']))
+    return Result(filtered, entry['objective'][()], iterations=iterations, basis=entry.get('basis'))
+
+
+# Utility functions
+def update_digest(digest, value):
+    # Numbers as float64 (None becomes nan), sparse matrices as CSR and
+    # anything else as JSON
+    if sparse.issparse(value):
+        update_sparse(digest, sparse.csr_matrix(value, dtype=float))
+        return
+    try:
+        values = np.asarray(value, dtype=float)
+    except (TypeError, ValueError):
+        digest.update(b'json' + json.dumps(value, sort_keys=True, default=repr).encode())
+        return
+    update_array(digest, values)
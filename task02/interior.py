@@ -1,15 +1,26 @@
 import numpy as np
 from numpy.linalg import norm
+from scipy import sparse
+from scipy.linalg import cho_factor, cho_solve
+from scipy.sparse.linalg import splu
 
-def interior_point(sample):
+from result import Phases, Result
+
+def interior_point(sample, observer=None, max_iterations=10000):
     A = sample['A']  # Constraint coefficients
     b = sample['b']  # Right-hand side values
     C = sample['C']  # Objective function coefficients
     is_max = sample["is_max"]  # Maximization or minimization flag
+
+    # Only Ax <= b, x >= 0 problems, general rows and bounds need the simplex
+    if 'constraints' in sample or 'bounds' in sample:
+        return Result(status='not applicable')
+
     alpha = 0.5 
     accuracy = 0.0001
 
-    A = np.array(A, float)
+    # Sparse A is kept sparse, the slack identity is never built
+    A = sparse.csr_matrix(A, dtype=float) if sparse.issparse(A) else np.array(A, float)
     b = np.array(b, float)
     C = np.array(C, float)
 
@@ -17,52 +28,54 @@ def interior_point(sample):
     M = A.shape[1]
 
     # Initial feasible solution
-    x = np.hstack((np.ones(M), b - np.sum(A, axis=1)))
-    A = np.hstack((A, np.eye(N)))
+    x = np.hstack((np.ones(M), b - np.asarray(A.sum(axis=1)).ravel()))
     c = np.hstack((C, np.zeros(N))) * (1 if is_max else -1)
 
-    i = 1
-    i = 1
-    while True:
+    # The method moves inside x > 0 only, so the slacks at x = 1 must be positive
+    if np.any(x <= 0):
+        return Result(status='not applicable')
+
+    # An observer gets a record of every iteration; without one nothing is timed
+    phases = Phases() if observer else None
+
+    for i in range(1, max_iterations + 1):
+        if observer:
+            phases.start()
+
         v = x
-        D = np.diag(x)
-        AA = np.dot(A, D)
-        cc = np.dot(D, c)
-        I = np.eye(x.size)
-        F = np.dot(AA, np.transpose(AA))
+        cp = projection(A, x, c)
+        if observer:
+            phases.lap('factorization')
 
-        # Check for unboundedness by examining if F is non-invertible.
-        try:
-            if np.linalg.cond(F) > 1 / accuracy:
-                pass
-        except:
-            print("The problem does not have solution!")
-            return
-
-        FI = np.linalg.inv(F)
-        H = np.dot(np.transpose(AA), FI)
-        P = np.subtract(I, np.dot(H, AA))
-        cp = np.dot(P, cc)
-
-        # Check for infeasibility.
-        if np.all(cp >= 0) and is_max or np.all(cp <= 0) and not is_max:
-            print("The problem does not have solution!")
-            return
-
-        nu = np.absolute(np.min(cp))
-        x_tilde = np.add(np.ones(x.size, float), (alpha / nu) * cp)
-        x = np.dot(D, x_tilde)
-
-        # Print the first few iterations for tracking
-        if i <= 4:
-            print(f"In iteration {i} we have:\nx= [{ ' '.join([str(i) for i in x]) }]")
-            i += 1
+        # Check for unboundedness by examining if F is non-invertible: the
+        # iterates stay feasible, so they only overflow it by diverging.
+        if cp is None:
+            return Result(status='unbounded', iterations=i)
 
-        # Check for convergence
-        if norm(np.subtract(x, v), ord=2) < accuracy:
+        # Check for unboundedness: c is maximized in both senses, and with no
+        # negative component the step along cp is unlimited.
+        if np.all(cp >= 0):
+            if np.any(cp > 0):
+                return Result(status='unbounded', iterations=i)
             break
 
-    print(f"In the last iteration {i} we have x:\n{ ' '.join([str(i) for i in x]) }")
+        x = affine_step(x, cp, alpha)
+        change = norm(x - v, axis=-1)
+
+        if observer:
+            phases.lap('step')
+            objective = np.dot(c, x)
+            # cp = X r with r the reduced costs of the maximization, which
+            # are all nonpositive at a dual feasible point
+            observer({'iteration': i, 'objective': objective if is_max else -objective, 'step': change,
+                      'primal_residual': norm(apply(A, x) - b), 'dual_residual': norm(np.maximum(cp / v, 0)),
+                      'times': phases.times})
+
+        # Check for convergence
+        if change < accuracy:
+            break
+    else:
+        return Result(status='iteration limit', iterations=max_iterations)
 
     z_new = np.dot(c, x)
     if not is_max:
@@ -70,4 +83,106 @@ def interior_point(sample):
 
     x = x[:M]
     filtered = [(i, sol) for (i, sol) in list(enumerate(x)) if abs(sol) > accuracy]
-    return filtered, z_new
+    return Result(filtered, z_new, iterations=i)
+
+
+# [A | I] v and [A | I]^T y without building the slack identity
+def apply(A, v):
+    return A @ v[:A.shape[1]] + v[A.shape[1]:]
+
+
+def apply_transpose(A, y):
+    return np.hstack((A.T @ y, y))
+
+
+# Factorization of the normal matrix [A | I] diag(d) [A | I]^T, returned as a
+# solve function so one factorization serves every right-hand side.
+# Dense matrices use Cholesky, sparse ones SuperLU.
+def normal_factor(A, d):
+    num_vars = A.shape[1]
+    if sparse.issparse(A):
+        F = sparse.csc_matrix(A @ sparse.diags(d[:num_vars]) @ A.T + sparse.diags(d[num_vars:]))
+        if not np.all(np.isfinite(F.data)):
+            return None
+        try:
+            return splu(F).solve
+        except RuntimeError:
+            return None
+
+    F = (A * d[:num_vars]) @ A.T
+    F[np.diag_indices_from(F)] += d[num_vars:]
+    if not np.all(np.isfinite(F)):
+        return None
+    try:
+        factor = cho_factor(F)
+    except np.linalg.LinAlgError:
+        return None
+    return lambda rhs: cho_solve(factor, rhs)
+
+
+# Projected gradient P D c of the scaled problem without forming P, D or I:
+# P D c = D c - D [A | I]^T y, where ([A | I] D^2 [A | I]^T) y = [A | I] D^2 c.
+# None when the normal matrix is singular.
+def projection(A, x, c):
+    if not sparse.issparse(A):
+        cp, singular = stacked_projection(A[None], x[None], c[None])
+        return None if singular[0] else cp[0]
+
+    solve = normal_factor(A, x ** 2)
+    if solve is None:
+        return None
+
+    cc = x * c
+    y = solve(apply(A, x * cc))
+    return cc - x * apply_transpose(A, y)
+
+
+# projection() of every problem of a (K, N, M) stack of dense A, with a
+# flag for the problems whose normal matrix is not finite or not positive
+# definite (their cp is meaningless). A single dense problem goes through
+# here as a stack of one, so batch.batch_interior_point takes the very
+# same steps as interior_point.
+def stacked_projection(A, x, c):
+    K, N, M = A.shape
+    xs, xw = x[:, :M], x[:, M:]
+    cc = x * c
+
+    F = (A * (xs ** 2)[:, None, :]) @ A.transpose(0, 2, 1)
+    F[:, np.arange(N), np.arange(N)] += xw ** 2
+    rhs = (A @ (xs * cc[:, :M])[:, :, None])[:, :, 0] + xw * cc[:, M:]
+
+    singular = ~np.all(np.isfinite(F), axis=(1, 2))
+    y = np.zeros((K, N))
+    y[~singular], failed = stacked_cholesky_solve(F[~singular], rhs[~singular])
+    singular[np.flatnonzero(~singular)[failed]] = True
+
+    cp = cc - x * np.concatenate(((A.transpose(0, 2, 1) @ y[:, :, None])[:, :, 0], y), axis=1)
+    return cp, singular
+
+
+# Cholesky solves of a stack of normal matrices, reading the upper triangle
+# like cho_factor; members that are not positive definite are flagged and
+# get y = 0
+def stacked_cholesky_solve(F, rhs):
+    upper = F.transpose(0, 2, 1)
+    singular = np.zeros(F.shape[0], bool)
+    try:
+        L = np.linalg.cholesky(upper)
+    except np.linalg.LinAlgError:
+        L = np.zeros(F.shape)
+        L[:, np.arange(F.shape[1]), np.arange(F.shape[1])] = 1
+        for k in range(F.shape[0]):
+            try:
+                L[k] = np.linalg.cholesky(upper[k])
+            except np.linalg.LinAlgError:
+                singular[k] = True
+    y = np.linalg.solve(L.transpose(0, 2, 1), np.linalg.solve(L, rhs[:, :, None]))[:, :, 0]
+    y[singular] = 0
+    return y, singular
+
+
+# Point after a step along cp: the most negative component shrinks by the
+# fraction alpha, on one point or row by row on a stack
+def affine_step(x, cp, alpha):
+    nu = np.absolute(np.min(cp, axis=-1, keepdims=True))
+    return x * (1 + (alpha / nu) * cp)
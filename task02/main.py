@@ -1,49 +1,80 @@
+import argparse
+from functools import partial
+
 import numpy as np
 
 from interior import interior_point
+from presolve import presolve_and_solve
+from primal_dual import primal_dual
 from simplex import simplex
+from revised import revised_simplex
 import samples
 
-def main():
+engines = {
+    'tableau': simplex,
+    'revised': revised_simplex,
+}
+
+interior_methods = {
+    'affine': interior_point,
+    'primal-dual': primal_dual,
+}
+
+def report(result):
+    # The solution and objective value, or what went wrong
+    if result:
+        solution, z_new = result
+        print(solution, z_new, '\n\n')
+    else:
+        print(result.message, '\n\n')
+
+
+def main(engine='tableau', interior='affine', pricing='dantzig', presolve=False):
+    simplex = partial(engines[engine], pricing=pricing)
+    interior_point = interior_methods[interior]
+    if presolve:
+        simplex = partial(presolve_and_solve, solver=simplex)
+        interior_point = partial(presolve_and_solve, solver=interior_point)
+
     print("First Sample:\n")
 
-    solution, z_new = interior_point(samples.first_sample)
-    print(solution, z_new, '\n\n')
+    report(interior_point(samples.first_sample))
 
-    solution, z_new = simplex(samples.first_sample)
-    print(solution, z_new, '\n\n')
+    report(simplex(samples.first_sample))
 
     print("Second Sample:\n")
 
-    _ = interior_point(samples.second_sample)
-    print('\n')
+    report(interior_point(samples.second_sample))
 
-    _ = simplex(samples.second_sample)
-    print('\n')
+    report(simplex(samples.second_sample))
 
     print("Third Sample:\n")
 
-    _ = interior_point(samples.third_sample)
-    print('\n')
+    report(interior_point(samples.third_sample))
 
-    _ = simplex(samples.third_sample)
-    print('\n')
+    report(simplex(samples.third_sample))
 
     print("Fourth Sample:\n")
 
-    solution, z_new = interior_point(samples.fourth_sample)
-    print(solution, z_new, '\n\n')
+    report(interior_point(samples.fourth_sample))
 
-    solution, z_new = simplex(samples.fourth_sample)
-    print(solution, z_new, '\n\n')
+    report(simplex(samples.fourth_sample))
 
     print("Fifth Sample:\n")
 
-    solution, z_new = interior_point(samples.fifth_sample)
-    print(solution, z_new, '\n\n')
+    report(interior_point(samples.fifth_sample))
+
+    report(simplex(samples.fifth_sample))
+
+    print("Sixth Sample:\n")
 
-    solution, z_new = simplex(samples.fifth_sample)
-    print(solution, z_new, '\n\n')
+    report(simplex(samples.sixth_sample))
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--engine', choices=engines, default='tableau')
+    parser.add_argument('--interior', choices=interior_methods, default='affine')
+    parser.add_argument('--pricing', choices=['dantzig', 'bland', 'steepest'], default='dantzig')
+    parser.add_argument('--presolve', action='store_true')
+    args = parser.parse_args()
+    main(args.engine, args.interior, args.pricing, args.presolve)
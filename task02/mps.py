@@ -0,0 +1,249 @@
+import mmap
+from array import array
+
+import numpy as np
+from scipy import sparse
+
+# Row types of the ROWS section and the sample constraint they map to
+row_kinds = {'L': '<=', 'G': '>=', 'E': '='}
+mps_kinds = {kind: code for code, kind in row_kinds.items()}
+
+
+def read_mps(path, fixed=False):
+    # Streams an MPS file into a sample dict with a CSR constraint matrix.
+    # The file is memory-mapped and parsed line by line; nonzeros go
+    # straight into typed COO arrays, so apart from the name tables the peak
+    # memory stays close to the size of the result. Free format splits data
+    # lines at whitespace, so names there cannot contain spaces; fixed takes
+    # every field from its columns and keeps spaces inside names.
+    row_index, col_index = {}, {}
+    kinds = []
+    objective = None
+    is_max = False
+
+    rows, cols, values = array('q'), array('q'), array('d')
+    C = array('d')
+    b = None
+    ranges = {}
+    lower, upper = {}, {}
+
+    section = None
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for line in iter(data.readline, b''):
+            fields = line.split()
+            if not fields or fields[0].startswith(b'*'):
+                continue
+
+            # Section headers start in the first column
+            if not line[:1].isspace():
+                section = fields[0].upper()
+                if section == b'OBJSENSE' and len(fields) > 1:
+                    is_max = fields[1].upper().startswith(b'MAX')
+                if section == b'ENDATA':
+                    break
+                continue
+            if fixed and section != b'OBJSENSE':
+                fields = fixed_fields(line)
+
+            if section == b'OBJSENSE':
+                is_max = fields[0].upper().startswith(b'MAX')
+
+            elif section == b'ROWS':
+                code, name = fields[0].upper().decode(), fields[1]
+                if code == 'N':
+                    # The first free row is the objective, later ones are dropped
+                    if objective is None:
+                        objective = name
+                    continue
+                row_index[name] = len(kinds)
+                kinds.append(row_kinds[code])
+
+            elif section == b'COLUMNS':
+                if len(fields) > 2 and fields[1] == b"'MARKER'":
+                    continue
+                name = fields[0]
+                j = col_index.get(name)
+                if j is None:
+                    j = col_index[name] = len(C)
+                    C.append(0.0)
+                for row, value in zip(fields[1::2], fields[2::2]):
+                    if row == objective:
+                        C[j] = float(value)
+                    elif row in row_index:
+                        rows.append(row_index[row])
+                        cols.append(j)
+                        values.append(float(value))
+
+            elif section == b'RHS':
+                if b is None:
+                    b = np.zeros(len(kinds))
+                pairs = fields[1:] if len(fields) % 2 else fields
+                for row, value in zip(pairs[0::2], pairs[1::2]):
+                    if row in row_index:
+                        b[row_index[row]] = float(value)
+
+            elif section == b'RANGES':
+                pairs = fields[1:] if len(fields) % 2 else fields
+                for row, value in zip(pairs[0::2], pairs[1::2]):
+                    ranges[row_index[row]] = float(value)
+
+            elif section == b'BOUNDS':
+                code, name = fields[0].upper(), fields[2]
+                value = float(fields[3]) if len(fields) > 3 else 0.0
+                j = col_index[name]
+                if code in (b'UP', b'UI'):
+                    upper[j] = value
+                    if value < 0 and j not in lower:
+                        lower[j] = None
+                elif code in (b'LO', b'LI'):
+                    lower[j] = value
+                elif code == b'FX':
+                    lower[j] = upper[j] = value
+                elif code == b'FR':
+                    lower[j] = upper[j] = None
+                elif code == b'MI':
+                    lower[j] = None
+                elif code == b'PL':
+                    upper[j] = None
+                elif code == b'BV':
+                    lower[j], upper[j] = 0.0, 1.0
+
+    num_constr, num_vars = len(kinds), len(C)
+    if b is None:
+        b = np.zeros(num_constr)
+    A = sparse.csr_matrix((np.frombuffer(values, float), (np.frombuffer(rows, np.int64), np.frombuffer(cols, np.int64))),
+                          shape=(num_constr, num_vars))
+
+    if ranges:
+        A, b, kinds = add_ranges(A, b, kinds, ranges)
+
+    sample = {
+        'A': A,
+        'b': b,
+        'C': np.frombuffer(C, float).copy(),
+        'is_max': is_max,
+    }
+    if any(kind != '<=' for kind in kinds):
+        sample['constraints'] = kinds
+    if lower or upper:
+        sample['bounds'] = [(lower.get(j, 0.0), upper.get(j)) for j in range(num_vars)]
+    return sample
+
+
+def write_mps(sample, path, name='LP', fixed=False):
+    # Writes a sample as MPS, one line per nonzero, streaming the columns of
+    # a CSC copy of A. Free format by default; fixed puts every field in its
+    # columns, so all names have to be at most 8 characters without spaces
+    # (at most 10^7 rows and columns) or a ValueError is raised
+    A = sparse.csc_matrix(sample['A'], dtype=float)
+    b = np.asarray(sample['b'], float)
+    C = np.asarray(sample['C'], float)
+    num_constr, num_vars = A.shape
+    kinds = sample.get('constraints', ['<='] * num_constr)
+    bounds = sample.get('bounds')
+
+    if fixed:
+        for label in (name, f'R{max(num_constr - 1, 0)}', f'X{max(num_vars - 1, 0)}'):
+            if len(label) > 8 or any(char.isspace() for char in label):
+                raise ValueError(f"MPS name {label!r} does not fit fixed format, write free format instead")
+
+    def line(code, *fields):
+        return file.write(data_line(fixed, code, *fields))
+
+    with open(path, 'w') as file:
+        file.write(f"NAME          {name}\n" if fixed else f"NAME {name}\n")
+        file.write("OBJSENSE\n")
+        line('', 'MAX' if sample['is_max'] else 'MIN')
+
+        file.write("ROWS\n")
+        line('N', 'obj')
+        for i, kind in enumerate(kinds):
+            line(mps_kinds[kind], f'R{i}')
+
+        file.write("COLUMNS\n")
+        for j in range(num_vars):
+            if C[j] != 0:
+                line('', f'X{j}', 'obj', C[j])
+            start, end = A.indptr[j], A.indptr[j + 1]
+            for i, value in zip(A.indices[start:end], A.data[start:end]):
+                line('', f'X{j}', f'R{i}', value)
+            if start == end and C[j] == 0:
+                # Keep empty columns so the variable count survives
+                line('', f'X{j}', 'obj', 0.0)
+
+        file.write("RHS\n")
+        for i in np.nonzero(b)[0]:
+            line('', 'RHS', f'R{i}', b[i])
+
+        if bounds is not None:
+            file.write("BOUNDS\n")
+            for j, (low, up) in enumerate(bounds):
+                if low is None and up is None:
+                    line('FR', 'BND', f'X{j}')
+                    continue
+                if low is not None and low == up:
+                    line('FX', 'BND', f'X{j}', low)
+                    continue
+                if low is None:
+                    line('MI', 'BND', f'X{j}')
+                elif low != 0:
+                    line('LO', 'BND', f'X{j}', low)
+                if up is not None:
+                    line('UP', 'BND', f'X{j}', up)
+
+        file.write("ENDATA\n")
+
+
+# Utility functions
+def add_ranges(A, b, kinds, ranges):
+    # A range R on a row turns it into low <= a x <= up; the sample format
+    # has no ranged rows, so the second bound becomes an extra row
+    extra = np.array(sorted(ranges))
+    extra_b = np.zeros(extra.size)
+    extra_kinds = []
+    for k, i in enumerate(extra):
+        r = ranges[i]
+        if kinds[i] == '=':
+            # Equality rows extend towards the sign of R
+            kinds[i] = '>=' if r > 0 else '<='
+        if kinds[i] == '<=':
+            extra_b[k] = b[i] - abs(r)
+            extra_kinds.append('>=')
+        else:
+            extra_b[k] = b[i] + abs(r)
+            extra_kinds.append('<=')
+
+    A = sparse.csr_matrix(sparse.vstack((A, A[extra])))
+    return A, np.hstack((b, extra_b)), kinds + extra_kinds
+
+
+def data_line(fixed, code, *fields) -> str:
+    # Names as given and the number, if any, last. Fixed format puts the code
+    # in columns 2-3, the names in 5-12 and 15-22 and the number in 25-36,
+    # shortened to 12 characters
+    names = [field for field in fields if isinstance(field, str)]
+    numbers = [float(field) for field in fields if not isinstance(field, str)]
+    if not fixed:
+        return ' '.join([f" {code:<2}"] + names + [repr(value) for value in numbers]) + '\n'
+    text = f" {code:<2} " + '  '.join(f"{field:<8}" for field in names)
+    for value in numbers:
+        text = f"{text:<24}{fixed_number(value)}"
+    return text.rstrip() + '\n'
+
+
+def fixed_fields(line) -> list:
+    # Nonblank fields of a fixed format data line: the code in columns 2-3,
+    # names in 5-12 and 15-22, a number in 25-36, then a second name and
+    # number pair in 40-47 and 50-61
+    columns = (slice(1, 3), slice(4, 12), slice(14, 22), slice(24, 36), slice(39, 47), slice(49, 61))
+    fields = [line[column].strip() for column in columns]
+    return [field for field in fields if field]
+
+
+def fixed_number(value) -> str:
+    # Shortest of repr and fewer significant digits that fits 12 characters
+    text, digits = repr(value), 12
+    while len(text) > 12:
+        digits -= 1
+        text = f"{value:.{digits}g}"
+    return text
@@ -0,0 +1,335 @@
+import numpy as np
+from scipy import sparse
+
+from result import Result
+from interior import interior_point
+from primal_dual import primal_dual
+from revised import revised_simplex, slack_bounds, variable_bounds
+from simplex import simplex
+
+
+class Presolve:
+    # Simplifies a sample before it reaches a solver: empty and singleton
+    # rows, fixed and empty variables, duplicate (parallel) rows and
+    # dominated columns are removed. Every removed variable is pushed on a
+    # postsolve stack with the value it was fixed at, so solutions of the
+    # reduced problem map back to the original variable indices.
+    #
+    # Rows are kept as ranges row_lower <= a x <= row_upper and variables as
+    # lower <= x <= upper; the reduced sample only carries 'constraints' and
+    # 'bounds' when it is not a plain A x <= b, x >= 0 problem.
+    def __init__(self, sample):
+        A = sample['A']  # Constraint coefficients
+        b = sample['b']  # Right-hand side values
+        C = sample['C']  # Objective function coefficients
+        self.is_max = sample['is_max']  # Maximization or minimization flag
+
+        self.eps = 0.0001
+        self.is_sparse = sparse.issparse(A)
+
+        self.A = sparse.csr_matrix(A, dtype=float, copy=True)
+        self.A.eliminate_zeros()
+        self.C = np.array(C, float)
+        b = np.array(b, float)
+
+        num_constr, num_vars = self.A.shape
+        constraints = sample.get('constraints', ['<='] * num_constr)
+        bounds = sample.get('bounds', [(0, None)] * num_vars)
+
+        # a x + s = b with the slack bounds turned into row activity bounds
+        slack_lower, slack_upper = slack_bounds(constraints)
+        self.row_lower = b - slack_upper
+        self.row_upper = b - slack_lower
+        self.lower, self.upper = variable_bounds(bounds)
+
+        self.rows = np.ones(num_constr, bool)
+        self.cols = np.ones(num_vars, bool)
+        self.value = np.zeros(num_vars)
+        self.stack = []
+        self.infeasible = False
+
+        self.run()
+
+    def run(self):
+        reductions = [
+            self.remove_empty_rows,
+            self.remove_free_rows,
+            self.remove_singleton_rows,
+            self.remove_fixed_columns,
+            self.remove_empty_columns,
+            self.remove_dominated_columns,
+            self.remove_duplicate_rows,
+        ]
+        changed = True
+        while changed and not self.infeasible:
+            changed = False
+            for reduction in reductions:
+                changed |= reduction()
+                if self.infeasible:
+                    return
+
+    def cost(self):
+        # Objective in maximization form
+        return self.C if self.is_max else -self.C
+
+    def live(self):
+        # Remaining submatrix with the original row and column indices
+        rows, cols = np.where(self.rows)[0], np.where(self.cols)[0]
+        return self.A[rows][:, cols], rows, cols
+
+    def remove_rows(self, rows, reason):
+        self.rows[rows] = False
+        self.stack.append((reason, rows, None))
+
+    def fix_columns(self, cols, values, reason):
+        # Substitute x_j = value into the row bounds and remove the columns
+        shift = self.A[:, cols] @ values
+        self.row_lower -= shift
+        self.row_upper -= shift
+        self.value[cols] = values
+        self.cols[cols] = False
+        self.stack.append((reason, cols, values))
+
+    def remove_empty_rows(self):
+        sub, rows, _ = self.live()
+        empty = rows[sub.getnnz(axis=1) == 0]
+        if empty.size == 0:
+            return False
+
+        if np.any(self.row_lower[empty] > self.eps) or np.any(self.row_upper[empty] < -self.eps):
+            self.infeasible = True
+        self.remove_rows(empty, 'empty row')
+        return True
+
+    def remove_free_rows(self):
+        # Rows without finite bounds constrain nothing
+        free = np.where(self.rows & np.isinf(self.row_lower) & np.isinf(self.row_upper))[0]
+        if free.size == 0:
+            return False
+
+        self.remove_rows(free, 'free row')
+        return True
+
+    def remove_singleton_rows(self):
+        # A single entry row is a bound on its variable
+        sub, rows, cols = self.live()
+        singleton = np.where(sub.getnnz(axis=1) == 1)[0]
+        if singleton.size == 0:
+            return False
+
+        entries = sub[singleton].tocoo()
+        for k, j, a in zip(entries.row, entries.col, entries.data):
+            i, j = rows[singleton[k]], cols[j]
+            low, up = self.row_lower[i] / a, self.row_upper[i] / a
+            if a < 0:
+                low, up = up, low
+            self.lower[j] = max(self.lower[j], low)
+            self.upper[j] = min(self.upper[j], up)
+
+        if np.any(self.lower > self.upper + self.eps):
+            self.infeasible = True
+        self.remove_rows(rows[singleton], 'singleton row')
+        return True
+
+    def remove_fixed_columns(self):
+        fixed = np.where(self.cols & (self.upper - self.lower <= self.eps))[0]
+        if fixed.size == 0:
+            return False
+
+        self.fix_columns(fixed, self.lower[fixed], 'fixed column')
+        return True
+
+    def remove_empty_columns(self):
+        # A variable in no row goes to the bound its cost prefers; columns
+        # pushed towards an infinite bound are left for the solver to report
+        sub, _, cols = self.live()
+        empty = cols[sub.getnnz(axis=0) == 0]
+        c = self.cost()[empty]
+        values = np.where(c > 0, self.upper[empty],
+                          np.where(c < 0, self.lower[empty], finite_bound(self.lower[empty], self.upper[empty])))
+        settled = np.isfinite(values)
+        if not np.any(settled):
+            return False
+
+        self.fix_columns(empty[settled], values[settled], 'empty column')
+        return True
+
+    def remove_dominated_columns(self):
+        # Decreasing x_j keeps every row feasible when its positive entries
+        # only meet upper row bounds and its negative ones only lower bounds;
+        # with a nonpositive cost it can then sit at its lower bound.
+        # Symmetrically for increasing towards the upper bound.
+        sub, rows, cols = self.live()
+        has_lower = np.isfinite(self.row_lower[rows]).astype(float)
+        has_upper = np.isfinite(self.row_upper[rows]).astype(float)
+        positive = (sub > 0).astype(float)
+        negative = (sub < 0).astype(float)
+
+        blocks_down = positive.T @ has_lower + negative.T @ has_upper
+        blocks_up = positive.T @ has_upper + negative.T @ has_lower
+
+        c = self.cost()[cols]
+        down = (blocks_down == 0) & (c <= 0) & np.isfinite(self.lower[cols])
+        up = ~down & (blocks_up == 0) & (c >= 0) & np.isfinite(self.upper[cols])
+        dominated = down | up
+        if not np.any(dominated):
+            return False
+
+        values = np.where(down, self.lower[cols], self.upper[cols])[dominated]
+        self.fix_columns(cols[dominated], values, 'dominated column')
+        return True
+
+    def remove_duplicate_rows(self):
+        # Parallel rows a_k = ratio * a_i merge into one row range
+        sub, rows, _ = self.live()
+        sub.sort_indices()
+        seen = {}
+        duplicates = []
+        for k in range(sub.shape[0]):
+            start, end = sub.indptr[k], sub.indptr[k + 1]
+            if start == end:
+                continue
+            scale = sub.data[start]
+            key = (sub.indices[start:end].tobytes(), np.round(sub.data[start:end] / scale, 9).tobytes())
+            if key not in seen:
+                seen[key] = (rows[k], scale)
+                continue
+
+            i, base = seen[key]
+            j = rows[k]
+            ratio = scale / base
+            low, up = self.row_lower[j] / ratio, self.row_upper[j] / ratio
+            if ratio < 0:
+                low, up = up, low
+            self.row_lower[i] = max(self.row_lower[i], low)
+            self.row_upper[i] = min(self.row_upper[i], up)
+            duplicates.append(j)
+
+        if not duplicates:
+            return False
+
+        if np.any(self.row_lower > self.row_upper + self.eps):
+            self.infeasible = True
+        self.remove_rows(np.array(duplicates), 'duplicate row')
+        return True
+
+    def reduced_sample(self):
+        sub, rows, cols = self.live()
+        row_lower, row_upper = self.row_lower[rows], self.row_upper[rows]
+
+        # Rows with a finite upper bound become <= (or =) rows, finite lower
+        # bounds of the remaining ones >= rows; ranged rows give one of each
+        equal = row_upper - row_lower <= self.eps
+        upper_rows = np.where(np.isfinite(row_upper))[0]
+        lower_rows = np.where(np.isfinite(row_lower) & ~equal)[0]
+
+        A = sparse.vstack((sub[upper_rows], sub[lower_rows]))
+        b = np.hstack((row_upper[upper_rows], row_lower[lower_rows]))
+        constraints = ['=' if is_equal else '<=' for is_equal in equal[upper_rows]]
+        constraints += ['>='] * lower_rows.size
+
+        lower, upper = self.lower[cols], self.upper[cols]
+        reduced = {
+            'A': sparse.csr_matrix(A) if self.is_sparse else A.toarray(),
+            'b': b,
+            'C': self.C[cols],
+            'is_max': self.is_max,
+        }
+        if any(kind != '<=' for kind in constraints):
+            reduced['constraints'] = constraints
+        if np.any(lower != 0) or np.any(np.isfinite(upper)):
+            reduced['bounds'] = [(None if np.isinf(low) else low, None if np.isinf(up) else up)
+                                 for low, up in zip(lower, upper)]
+        return reduced
+
+    def plain_sample(self):
+        # Reduced problem as A x <= b, x >= 0 for the interior methods:
+        # finite upper bounds and positive lower bounds become rows, >= rows
+        # are negated. None when that is not possible (free or negative
+        # variables, equality rows).
+        reduced = self.reduced_sample()
+        lower, upper = self.lower[self.cols], self.upper[self.cols]
+        constraints = reduced.get('constraints', ['<='] * len(reduced['b']))
+        if np.any(lower < 0) or '=' in constraints:
+            return None
+
+        A = sparse.csr_matrix(reduced['A'])
+        sign = np.where(np.array(constraints) == '>=', -1.0, 1.0)
+        identity = sparse.identity(len(lower), format='csr')
+        capped, raised = np.where(np.isfinite(upper))[0], np.where(lower > 0)[0]
+        A = sparse.vstack((sparse.diags(sign) @ A, identity[capped], -identity[raised]), format='csr')
+        b = np.hstack((sign * reduced['b'], upper[capped], -lower[raised]))
+        return {
+            'A': A if self.is_sparse else A.toarray(),
+            'b': b,
+            'C': reduced['C'],
+            'is_max': self.is_max,
+        }
+
+    def report(self):
+        num_constr, num_vars = self.A.shape
+        rows, cols = np.count_nonzero(self.rows), np.count_nonzero(self.cols)
+        return {
+            'rows': (num_constr, rows),
+            'columns': (num_vars, cols),
+            'removed rows': 1 - rows / max(num_constr, 1),
+            'removed columns': 1 - cols / max(num_vars, 1),
+        }
+
+    def postsolve(self, result, negated_minimum=False):
+        # Map a (filtered, objective) result of the reduced problem back to
+        # the original variables. negated_minimum marks solvers that report
+        # a minimum as max(-C x), like the simplex engines.
+        if not result:
+            return result
+
+        filtered, objective_value = result
+        x = self.value.copy()
+        cols = np.where(self.cols)[0]
+        for i, sol in filtered:
+            x[cols[i]] = sol
+
+        fixed = ~self.cols
+        offset = np.dot(self.C[fixed], self.value[fixed])
+        if negated_minimum and not self.is_max:
+            offset = -offset
+
+        filtered = [(i, sol) for (i, sol) in list(enumerate(x)) if abs(sol) > self.eps]
+        return Result(filtered, objective_value + offset, iterations=getattr(result, 'iterations', 0))
+
+
+def presolve_and_solve(sample, solver=simplex):
+    engine = getattr(solver, 'func', solver)
+    presolve = Presolve(sample)
+    if presolve.infeasible:
+        return Result(status='infeasible')
+
+    if not np.any(presolve.cols):
+        # Everything was fixed, the solver has nothing left to do
+        result = Result([], 0.0)
+    elif not np.any(presolve.rows):
+        # Columns left without rows are the ones pushed to an infinite bound
+        return Result(status='unbounded')
+    else:
+        if engine in (interior_point, primal_dual):
+            # Only plain problems, and interior_point starts at x = 1; when
+            # the reduced problem does not allow that, the original is solved
+            reduced = presolve.plain_sample()
+            if reduced is None or engine is interior_point and not ones_feasible(reduced):
+                return solver(sample)
+        else:
+            reduced = presolve.reduced_sample()
+        result = solver(reduced)
+
+    return presolve.postsolve(result, negated_minimum=engine in (simplex, revised_simplex))
+
+
+# Utility functions
+def ones_feasible(sample):
+    # A 1 < b, the all-ones point is strictly inside
+    return bool(np.all(np.asarray(sample['A'].sum(axis=1)).ravel() < sample['b']))
+
+
+def finite_bound(lower, upper):
+    # Lower bound if finite, else upper, else zero
+    return np.where(np.isfinite(lower), lower, np.where(np.isfinite(upper), upper, 0))
@@ -0,0 +1,131 @@
+import numpy as np
+from numpy.linalg import norm
+from scipy import sparse
+
+from interior import apply, apply_transpose, normal_factor
+from result import Phases, Result
+
+
+def primal_dual(sample, tolerance=1e-8, max_iterations=100, observer=None):
+    A = sample['A']  # Constraint coefficients
+    b = sample['b']  # Right-hand side values
+    C = sample['C']  # Objective function coefficients
+    is_max = sample['is_max']  # Maximization or minimization flag
+
+    # Only Ax <= b, x >= 0 problems, general rows and bounds need the simplex
+    if 'constraints' in sample or 'bounds' in sample:
+        return Result(status='not applicable')
+
+    accuracy = 0.0001
+    eta = 0.99  # Fraction of the step to the boundary
+
+    A = sparse.csr_matrix(A, dtype=float) if sparse.issparse(A) else np.array(A, float)
+    b = np.array(b, float)
+    C = np.array(C, float)
+
+    N = A.shape[0]
+    M = A.shape[1]
+
+    # min q x  s.t. [A | I] x = b, x >= 0  and its dual  [A | I]^T y + z = q, z >= 0
+    q = np.hstack((-C if is_max else C, np.zeros(N)))
+
+    # Mehrotra's starting point: least-squares solutions shifted into the interior
+    solve = normal_factor(A, np.ones(M + N))
+    x = apply_transpose(A, solve(b))
+    y = solve(apply(A, q))
+    z = q - apply_transpose(A, y)
+    x += max(-1.5 * np.min(x), 0)
+    z += max(-1.5 * np.min(z), 0)
+    xz = np.dot(x, z)
+    x += 0.5 * xz / max(np.sum(z), accuracy) + accuracy
+    z += 0.5 * xz / max(np.sum(x), accuracy) + accuracy
+
+    # An observer gets a record of every iteration; without one nothing is timed
+    phases = Phases() if observer else None
+    primal_feasible = False
+
+    for i in range(1, max_iterations + 1):
+        if observer:
+            phases.start()
+
+        r_b = b - apply(A, x)
+        r_c = q - apply_transpose(A, y) - z
+        mu = np.dot(x, z) / x.size
+
+        # Stop on relative primal/dual infeasibility and relative duality gap
+        primal_value, dual_value = np.dot(q, x), np.dot(b, y)
+        primal_residual, dual_residual = norm(r_b), norm(r_c)
+        if primal_residual / (1 + norm(b)) < tolerance and \
+                dual_residual / (1 + norm(q)) < tolerance and \
+                abs(primal_value - dual_value) / (1 + abs(primal_value)) < tolerance:
+            break
+
+        # Diverging iterates certify the problem has no optimum: a primal ray
+        # from a primal feasible point makes it unbounded, anything else
+        # (a dual ray, or x growing while A x = b is still unmet) infeasible
+        primal_feasible |= primal_residual / (1 + norm(b)) < tolerance
+        status = divergence(x, z, 1 / tolerance ** 2, primal_feasible)
+        if status:
+            return Result(status=status, iterations=i)
+
+        # One factorization of [A | I] (X/Z) [A | I]^T per iteration
+        d = x / z
+        solve = normal_factor(A, d)
+        if solve is None:
+            return Result(status=divergence(x, z, 0, primal_feasible), iterations=i)
+        if observer:
+            phases.lap('factorization')
+
+        def newton_step(r_xz):
+            dy = solve(r_b + apply(A, d * r_c - r_xz / z))
+            dz = r_c - apply_transpose(A, dy)
+            dx = (r_xz - x * dz) / z
+            return dx, dy, dz
+
+        # Predictor: pure Newton (affine-scaling) direction
+        dx, dy, dz = newton_step(-x * z)
+        alpha_p = min(1, step_length(x, dx))
+        alpha_d = min(1, step_length(z, dz))
+        mu_aff = np.dot(x + alpha_p * dx, z + alpha_d * dz) / x.size
+        sigma = (mu_aff / mu) ** 3
+
+        # Corrector: centering plus the second-order term, same factorization
+        dx, dy, dz = newton_step(sigma * mu - x * z - dx * dz)
+        alpha_p = min(1, eta * step_length(x, dx))
+        alpha_d = min(1, eta * step_length(z, dz))
+
+        x = x + alpha_p * dx
+        y = y + alpha_d * dy
+        z = z + alpha_d * dz
+
+        if observer:
+            phases.lap('step')
+            observer({'iteration': i, 'objective': np.dot(C, x[:M]), 'step': alpha_p, 'dual_step': alpha_d,
+                      'mu': mu, 'primal_residual': primal_residual, 'dual_residual': dual_residual,
+                      'times': phases.times})
+    else:
+        return Result(status='iteration limit', iterations=max_iterations)
+
+    z_new = np.dot(C, x[:M])
+
+    x = x[:M]
+    filtered = [(i, sol) for (i, sol) in list(enumerate(x)) if abs(sol) > accuracy]
+    return Result(filtered, z_new, iterations=i - 1)
+
+
+# Largest step in [0, inf) keeping v + alpha * dv nonnegative
+def step_length(v, dv):
+    negative = dv < 0
+    if not np.any(negative):
+        return np.inf
+    return np.min(-v[negative] / dv[negative])
+
+
+# Status of iterates past limit: 'unbounded' for a growing x that met
+# A x = b and a z that did not outgrow it, else 'infeasible'; None below
+def divergence(x, z, limit, primal_feasible):
+    if max(norm(x), norm(z)) <= limit:
+        return None
+    if primal_feasible and norm(x) >= norm(z):
+        return 'unbounded'
+    return 'infeasible'
@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common'))
+
+import solve_result
+
+
+class Result(solve_result.Result):
+    # (filtered, objective value) of an LP solve with its status and number
+    # of iterations. Simplex solvers also attach the final basis, the basic
+    # variable of every row (slacks numbered after the structural
+    # variables).
+    messages = {
+        'infeasible': "The problem does not have solution!",
+        'unbounded': "The method is not applicable.",
+        'not applicable': "The method is not applicable.",
+        'iteration limit': "The iteration limit was reached.",
+    }
+
+    def __new__(cls, filtered=None, objective_value=None, status='optimal', iterations=0, basis=None):
+        result = super().__new__(cls, filtered, objective_value, status, iterations)
+        result.basis = basis
+        return result
+
+
+class Phases:
+    # Wall time of the phases of one iteration (pricing, ratio test,
+    # factorization, ...); solvers only create one for an observer, which
+    # gets the times dict in its per-iteration record. Every LP solver's
+    # record has 'iteration', 'objective', 'step', 'primal_residual',
+    # 'dual_residual' and 'times'; the simplex engines add the pivot
+    # ('pivot_row', 'pivot_col'), revised_simplex its 'phase' and
+    # primal_dual its 'dual_step' and 'mu'.
+    def __init__(self):
+        self.times = {}
+        self.last = 0.0
+
+    def start(self):
+        self.times = {}
+        self.last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.times[phase] = self.times.get(phase, 0.0) + now - self.last
+        self.last = now
@@ -0,0 +1,438 @@
+import numpy as np
+from scipy import sparse
+from scipy.linalg import lu_factor, lu_solve
+from scipy.sparse.linalg import splu
+
+from result import Phases, Result
+
+# Consecutive degenerate pivots tolerated before switching to Bland's rule
+max_degenerate_pivots = 50
+
+
+class BasisFactor:
+    # LU factorization of the basis matrix kept up to date with product-form
+    # (eta) updates; the factorization is rebuilt every `refactor_every` pivots.
+    def __init__(self, B, refactor_every=50):
+        self.refactor_every = refactor_every
+        self.refactor(B)
+
+    def refactor(self, B):
+        # Sparse bases are factored with SuperLU, dense ones with LAPACK
+        if sparse.issparse(B):
+            self.lu = splu(sparse.csc_matrix(B))
+        else:
+            self.lu = lu_factor(B)
+        self.etas = []
+
+    def solve(self, a, trans=False):
+        if isinstance(self.lu, tuple):
+            return lu_solve(self.lu, a, trans=int(trans))
+        return self.lu.solve(a, trans='T' if trans else 'N')
+
+    def ftran(self, a):
+        # Solve B x = a
+        x = self.solve(a)
+        for r, eta in self.etas:
+            x_r = x[r]
+            x += x_r * eta
+            x[r] = x_r * eta[r]
+        return x
+
+    def btran(self, c):
+        # Solve B^T y = c
+        w = np.array(c, float)
+        for r, eta in reversed(self.etas):
+            w[r] = np.dot(w, eta)
+        return self.solve(w, trans=True)
+
+    def update(self, r, d):
+        # Column r of the basis is replaced, d = B^{-1} a_q for the entering column
+        eta = -d / d[r]
+        eta[r] = 1 / d[r]
+        self.etas.append((r, eta))
+
+    def needs_refactor(self):
+        return len(self.etas) >= self.refactor_every
+
+
+def revised_simplex(sample, refactor_every=50, pricing='dantzig', observer=None):
+    return RevisedSimplex(sample, refactor_every, pricing, observer).solve()
+
+
+class RevisedSimplex:
+    # Revised simplex solver that keeps its basis and factorization between
+    # solves, so a changed right-hand side, objective or an extra constraint
+    # is re-optimized from the previous basis (dual simplex when the basis
+    # lost primal feasibility, primal simplex otherwise).
+    # Pricing is 'dantzig', 'bland' or 'steepest' (devex reference weights).
+    #
+    # Optional sample keys: 'constraints' gives every row as '<=', '>=' or '='
+    # and 'bounds' gives every variable a (lower, upper) pair, None meaning
+    # unbounded; the defaults are '<=' rows and (0, None) bounds. Each row has
+    # exactly one slack whose bounds encode the row type, so equalities and
+    # >= rows never add rows, and bounds are handled by the ratio test
+    # instead of extra constraints. An infeasible start is repaired by a
+    # phase one that minimizes the sum of infeasibilities.
+    #
+    # An observer, when given, is called with a record of every iteration
+    # of the dual, phase one and phase two loops.
+    def __init__(self, sample, refactor_every=50, pricing='dantzig', observer=None):
+        A = sample['A']  # Constraint coefficients
+        b = sample['b']  # Right-hand side values
+        C = sample['C']  # Objective function coefficients
+        self.is_max = sample['is_max']  # Maximization or minimization flag
+
+        self.eps = 0.0001
+
+        # Sparse constraint matrices stay sparse, column access wants CSC
+        self.A = sparse.csc_matrix(A, dtype=float) if sparse.issparse(A) else np.array(A, float)
+        self.b = np.array(b, float)
+        self.C = np.array(C, float)
+
+        num_constr, num_vars = self.A.shape
+        constraints = sample.get('constraints', ['<='] * num_constr)
+        bounds = sample.get('bounds', [(0, None)] * num_vars)
+
+        # Bounds of [x | slacks]; nonbasic variables sit on a finite bound
+        var_lower, var_upper = variable_bounds(bounds)
+        slack_lower, slack_upper = slack_bounds(constraints)
+        self.lower = np.hstack((var_lower, slack_lower))
+        self.upper = np.hstack((var_upper, slack_upper))
+        self.x = np.where(np.isfinite(self.lower), self.lower,
+                          np.where(np.isfinite(self.upper), self.upper, 0))
+
+        # Start from the all-slack basis
+        self.basis = np.arange(num_vars, num_vars + num_constr)
+        self.factor = BasisFactor(basis_matrix(self.A, self.basis), refactor_every)
+        self.compute_basics()
+        self.pivots = 0
+        self.iterations = 0
+
+        self.pricing = pricing
+        self.weights = np.ones(num_vars + num_constr)
+
+        self.observer = observer
+        self.phases = Phases() if observer else None
+
+    def solve(self):
+        start = self.iterations
+        if np.any(self.infeasibility()) and self.dual_feasible():
+            if not self.dual_simplex():
+                return Result(status='infeasible', iterations=self.iterations - start)
+
+        # Phase one removes any infeasibility left, phase two optimizes
+        if not self.primal_simplex(phase_one=True):
+            return Result(status='infeasible', iterations=self.iterations - start)
+
+        if not self.primal_simplex():
+            return Result(status='unbounded', iterations=self.iterations - start)
+
+        filtered, objective_value = self.solution()
+        return Result(filtered, objective_value, iterations=self.iterations - start, basis=self.basis.copy())
+
+    def update_rhs(self, b):
+        self.b = np.array(b, float)
+        self.compute_basics()
+        return self.solve()
+
+    def update_objective(self, C):
+        self.C = np.array(C, float)
+        return self.solve()
+
+    def add_constraint(self, row, rhs, kind='<='):
+        # The new row gets its own slack, which enters the basis
+        num_constr, num_vars = self.A.shape
+        row = np.array(row, float)
+        if sparse.issparse(self.A):
+            self.A = sparse.csc_matrix(sparse.vstack((self.A, sparse.csr_matrix(row))))
+        else:
+            self.A = np.vstack((self.A, row))
+        self.b = np.append(self.b, rhs)
+
+        slack_lower, slack_upper = slack_bounds([kind])
+        self.lower = np.append(self.lower, slack_lower)
+        self.upper = np.append(self.upper, slack_upper)
+        self.x = np.append(self.x, 0)
+        self.basis = np.append(self.basis, num_vars + num_constr)
+        self.weights = np.append(self.weights, 1)
+        self.refactor()
+        return self.solve()
+
+    def cost(self):
+        # Maximize c x over [A | I], slack costs are zero
+        return np.hstack((self.C if self.is_max else -self.C, np.zeros(self.A.shape[0])))
+
+    def reduced_costs(self, c=None):
+        if c is None:
+            c = self.cost()
+        y = self.factor.btran(c[self.basis])
+        reduced = c - np.hstack((self.A.T @ y, y))
+        reduced[self.basis] = 0
+        return reduced
+
+    def improving(self, reduced):
+        # Nonbasic variables that can move in the direction of their reduced cost
+        eps = self.eps
+        return (reduced > eps) & (self.x < self.upper - eps) | \
+            (reduced < -eps) & (self.x > self.lower + eps)
+
+    def dual_feasible(self):
+        return not np.any(self.improving(self.reduced_costs()))
+
+    def infeasibility(self):
+        # Phase one cost of the basic variables: +1 below the lower bound,
+        # -1 above the upper bound
+        x_basis = self.x[self.basis]
+        below = x_basis < self.lower[self.basis] - self.eps
+        above = x_basis > self.upper[self.basis] + self.eps
+        return below.astype(float) - above
+
+    def primal_simplex(self, phase_one=False):
+        eps = self.eps
+        use_bland = self.pricing == 'bland'
+        degenerate_pivots = 0
+        while True:
+            if self.observer:
+                self.phases.start()
+
+            # Pricing: reduced costs of every column against the current duals
+            if phase_one:
+                cost_basis = self.infeasibility()
+                if not np.any(cost_basis):
+                    return True
+                c = np.zeros(self.x.size)
+                c[self.basis] = cost_basis
+                reduced = self.reduced_costs(c)
+            else:
+                reduced = self.reduced_costs()
+
+            # Without an improving column phase one proves infeasibility,
+            # phase two optimality
+            candidates = np.where(self.improving(reduced))[0]
+            if candidates.size == 0:
+                return not phase_one
+
+            if use_bland:
+                pivot_col = candidates[0]
+            elif self.pricing == 'steepest':
+                pivot_col = candidates[np.argmax(reduced[candidates] ** 2 / self.weights[candidates])]
+            else:
+                pivot_col = candidates[np.argmax(np.abs(reduced[candidates]))]
+            direction = np.sign(reduced[pivot_col])
+            self.iterations += 1
+            if self.observer:
+                self.phases.lap('pricing')
+
+            # Ratio test on the entering column expressed in the current basis
+            d = self.factor.ftran(column(self.A, pivot_col))
+            if self.observer:
+                self.phases.lap('factorization')
+            step, pivot_row, bound = self.ratio_test(direction * d, pivot_col, use_bland)
+            if np.isinf(step):
+                return False
+            if self.observer:
+                self.phases.lap('ratio test')
+
+            # Fall back to Bland's rule when degenerate pivots start to cycle
+            degenerate_pivots = degenerate_pivots + 1 if step < eps else 0
+            if degenerate_pivots > max_degenerate_pivots:
+                use_bland = True
+
+            self.x[self.basis] -= step * direction * d
+            self.x[pivot_col] += step * direction
+            if pivot_row is not None:
+                self.x[self.basis[pivot_row]] = bound
+                if self.pricing == 'steepest':
+                    self.update_weights(pivot_row, pivot_col, d)
+                self.pivot(pivot_row, pivot_col, d)
+            # Otherwise the entering variable only moved to its opposite bound
+
+            if self.observer:
+                self.phases.lap('factorization')
+                self.notify('phase one' if phase_one else 'phase two', step, pivot_row, pivot_col,
+                            np.max(np.abs(reduced[candidates])))
+
+    def ratio_test(self, delta, pivot_col, use_bland):
+        # Basic variables change by -step * delta. Decreasing ones stop at
+        # their lower bound, increasing ones at their upper bound; in phase
+        # one an infeasible variable stops where it becomes feasible.
+        eps = self.eps
+        x_basis = self.x[self.basis]
+        lower, upper = self.lower[self.basis], self.upper[self.basis]
+
+        decreasing, increasing = delta > eps, delta < -eps
+        down_to = np.where(x_basis > upper + eps, upper, np.where(x_basis >= lower - eps, lower, -np.inf))
+        up_to = np.where(x_basis < lower - eps, lower, np.where(x_basis <= upper + eps, upper, np.inf))
+        target = np.where(decreasing, down_to, np.where(increasing, up_to, np.nan))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = (x_basis - target) / delta
+        ratios[~np.isfinite(ratios)] = np.inf
+        ratios = np.maximum(ratios, 0)
+
+        # A bounded entering variable may reach its other bound first
+        flip = self.upper[pivot_col] - self.lower[pivot_col]
+        best = np.min(ratios)
+        if flip <= best:
+            return flip, None, None
+
+        # Among tied rows Bland takes the smallest basic index,
+        # the other rules the largest pivot element
+        ties = np.where(ratios - best <= eps)[0]
+        if use_bland:
+            pivot_row = ties[np.argmin(self.basis[ties])]
+        else:
+            pivot_row = ties[np.argmax(np.abs(delta[ties]))]
+        return ratios[pivot_row], pivot_row, target[pivot_row]
+
+    def dual_simplex(self):
+        eps = self.eps
+        while True:
+            if self.observer:
+                self.phases.start()
+
+            # Leaving row: the basic variable furthest outside its bounds
+            x_basis = self.x[self.basis]
+            lower, upper = self.lower[self.basis], self.upper[self.basis]
+            violation = np.maximum(lower - x_basis, x_basis - upper)
+            pivot_row = np.argmax(violation)
+            if violation[pivot_row] <= eps:
+                return True
+
+            below = x_basis[pivot_row] < lower[pivot_row]
+            bound = lower[pivot_row] if below else upper[pivot_row]
+
+            # Row of B^{-1} [A | I] for the leaving variable; the entering
+            # variable has to push it back towards the violated bound
+            alpha = self.pivot_row(pivot_row) * (1 if below else -1)
+            alpha[self.basis] = 0
+            candidates = np.where((self.x < self.upper - eps) & (alpha < -eps) |
+                                  (self.x > self.lower + eps) & (alpha > eps))[0]
+            if candidates.size == 0:
+                return False
+
+            self.iterations += 1
+            if self.observer:
+                self.phases.lap('pricing')
+
+            # Dual ratio test keeps the reduced costs dual feasible
+            ratios = np.abs(self.reduced_costs()[candidates] / alpha[candidates])
+            pivot_col = candidates[np.argmin(ratios)]
+            if self.observer:
+                self.phases.lap('ratio test')
+
+            d = self.factor.ftran(column(self.A, pivot_col))
+            step = (x_basis[pivot_row] - bound) / d[pivot_row]
+            self.x[self.basis] -= step * d
+            self.x[pivot_col] += step
+            self.x[self.basis[pivot_row]] = bound
+            self.pivot(pivot_row, pivot_col, d)
+
+            if self.observer:
+                self.phases.lap('factorization')
+                self.notify('dual', step, pivot_row, pivot_col, 0.0)
+
+    def notify(self, phase, step, pivot_row, pivot_col, dual_residual):
+        # Per-iteration record for the observer; the primal residual is the
+        # total bound violation of the basic variables
+        x_basis = self.x[self.basis]
+        violation = np.maximum(self.lower[self.basis] - x_basis, 0) + np.maximum(x_basis - self.upper[self.basis], 0)
+        self.observer({
+            'iteration': self.iterations,
+            'phase': phase,
+            'objective': np.dot(self.cost(), self.x),
+            'step': step,
+            'pivot_row': pivot_row,
+            'pivot_col': pivot_col,
+            'primal_residual': np.sum(violation),
+            'dual_residual': dual_residual,
+            'times': self.phases.times,
+        })
+
+    def update_weights(self, pivot_row, pivot_col, d):
+        # Devex reference weights from the pivot row of B^{-1} [A | I]
+        alpha = self.pivot_row(pivot_row) / d[pivot_row]
+        leaving = self.basis[pivot_row]
+        weight = self.weights[pivot_col]
+        self.weights = np.maximum(self.weights, alpha ** 2 * weight)
+        self.weights[leaving] = max(weight / d[pivot_row] ** 2, 1)
+
+    def pivot_row(self, pivot_row):
+        unit = np.zeros(self.basis.size)
+        unit[pivot_row] = 1
+        rho = self.factor.btran(unit)
+        return np.hstack((self.A.T @ rho, rho))
+
+    def pivot(self, pivot_row, pivot_col, d):
+        self.basis[pivot_row] = pivot_col
+        self.pivots += 1
+
+        self.factor.update(pivot_row, d)
+        if self.factor.needs_refactor():
+            self.refactor()
+
+    def refactor(self):
+        self.factor.refactor(basis_matrix(self.A, self.basis))
+        self.compute_basics()
+
+    def compute_basics(self):
+        # x_B = B^{-1} (b - N x_N) for the current nonbasic values
+        nonbasic = self.x.copy()
+        nonbasic[self.basis] = 0
+        self.x[self.basis] = self.factor.ftran(self.b - activity(self.A, nonbasic))
+
+    def solution(self):
+        num_vars = self.A.shape[1]
+        solution = self.x[:num_vars]
+
+        # Calculate objective value
+        objective_value = np.dot(self.cost(), self.x)
+        filtered = [(i, sol) for (i, sol) in list(enumerate(solution)) if abs(sol) > self.eps]
+        return filtered, objective_value
+
+
+# Utility functions, the slack identity of [A | I] is kept implicit
+def column(A, j):
+    num_constr, num_vars = A.shape
+    if j < num_vars:
+        if not sparse.issparse(A):
+            return A[:, j].copy()
+        start, end = A.indptr[j], A.indptr[j + 1]
+        col = np.zeros(num_constr)
+        col[A.indices[start:end]] = A.data[start:end]
+        return col
+    slack = np.zeros(num_constr)
+    slack[j - num_vars] = 1
+    return slack
+
+
+def basis_matrix(A, basis):
+    num_constr, num_vars = A.shape
+    if not sparse.issparse(A):
+        return np.column_stack([column(A, j) for j in basis])
+
+    structural = np.where(basis < num_vars)[0]
+    slacks = np.where(basis >= num_vars)[0]
+    block = A[:, basis[structural]].tocoo()
+    rows = np.hstack((block.row, basis[slacks] - num_vars))
+    cols = np.hstack((structural[block.col], slacks))
+    data = np.hstack((block.data, np.ones(slacks.size)))
+    return sparse.csc_matrix((data, (rows, cols)), shape=(num_constr, num_constr))
+
+
+def activity(A, x):
+    # [A | I] x
+    return A @ x[:A.shape[1]] + x[A.shape[1]:]
+
+
+def variable_bounds(bounds):
+    lower = np.array([-np.inf if low is None else low for low, _ in bounds], float)
+    upper = np.array([np.inf if up is None else up for _, up in bounds], float)
+    return lower, upper
+
+
+def slack_bounds(constraints):
+    # A x + s = b: s >= 0 for '<=', s <= 0 for '>=' and s = 0 for '='
+    lower = np.array([-np.inf if kind == '>=' else 0 for kind in constraints], float)
+    upper = np.array([np.inf if kind == '<=' else 0 for kind in constraints], float)
+    return lower, upper
@@ -49,4 +49,17 @@ fifth_sample = {
     'b': [360.0, 192.0, 180.0],
     'C': [9.0, 10.0, 16.0],
     'is_max': False
-}
\ No newline at end of file
+}
+
+sixth_sample = {
+    'A': [
+        [1.0, 1.0, 1.0],
+        [2.0, -1.0, 0.0],
+        [0.0, 1.0, 3.0]
+    ],
+    'b': [10.0, 2.0, 6.0],
+    'C': [3.0, 2.0, 4.0],
+    'constraints': ['=', '>=', '<='],
+    'bounds': [(0, 6.0), (1.0, None), (0, None)],
+    'is_max': True
+}
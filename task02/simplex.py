@@ -1,14 +1,23 @@
 import numpy as np
+from scipy import sparse
+
+from result import Phases, Result
+from revised import revised_simplex, max_degenerate_pivots
 
 # Set error handling for division by zero
 np.seterr(divide='ignore')
 
-def simplex(sample):
+def simplex(sample, pricing='dantzig', observer=None):
     A = sample['A']  # Constraint coefficients
     b = sample['b']  # Right-hand side values
     C = sample['C']  # Objective function coefficients
     is_max = sample['is_max']  # Maximization or minimization flag
-    
+
+    # A dense tableau would undo the sparsity, and =/>= rows, variable bounds
+    # or an infeasible all-slack start need the bounded revised engine
+    if sparse.issparse(A) or 'constraints' in sample or 'bounds' in sample or np.any(np.array(b) < 0):
+        return revised_simplex(sample, pricing=pricing, observer=observer)
+
     eps = 0.0001
     num_constr = len(A)
     num_vars = len(C)
@@ -31,61 +40,111 @@ def simplex(sample):
     # Add identity matrix for slack variables
     tableau[1:, num_vars:num_vars + num_constr] = np.identity(num_constr)
 
+    # Basic variable of every constraint row, the slacks to begin with
+    basis = np.arange(num_vars, num_vars + num_constr)
+    use_bland = pricing == 'bland'
+    degenerate_pivots = 0
+
+    # An observer gets a record of every pivot; without one nothing is timed
+    phases = Phases() if observer else None
+    iteration = 0
+
     # Perform the simplex algorithm
     while non_zero_presence(tableau[0, :-1], eps):
+        iteration += 1
+        if observer:
+            phases.start()
+
         # Identify pivot column
-        pivot_col = np.argmin(tableau[0, :-1])
+        if use_bland:
+            pivot_col = bland_pricing(tableau, eps)
+        else:
+            pivot_col = pricing_rules[pricing](tableau, eps)
+        if observer:
+            # Largest reduced cost still improving, before the pivot
+            dual_residual = max(-np.min(tableau[0, :-1]), 0.0)
+            phases.lap('pricing')
 
         # Calculate ratios to find pivot row
-        ratios = tableau[1:, -1] / tableau[1:, pivot_col]
-        ratios[ratios < eps] = np.inf  # Ignore non-positive values
+        ratios = ratio_test(tableau[1:, -1], tableau[1:, pivot_col], eps)
 
         # Check for boundedness
         if check_boundedness(ratios, eps):
-            return
-
-        # Check for degeneracy
-        if check_degenerate(ratios):
-            print("Degenerate solution!")
-            break
-
-        # Select pivot row
-        pivot_row = np.argmin(ratios) + 1
-        pivot = tableau[pivot_row, pivot_col]
-
-        # Normalize the pivot row
-        tableau[pivot_row] /= pivot
-        for i in range(num_constr + 1):
-            if i != pivot_row:
-                tableau[i] -= tableau[i, pivot_col] * tableau[pivot_row]
+            return Result(status='unbounded', iterations=iteration)
+
+        # Select pivot row among the tied minimum ratios
+        ties = check_degenerate(ratios, eps)
+        if use_bland:
+            pivot_row = ties[np.argmin(basis[ties])] + 1
+        else:
+            pivot_row = ties[np.argmax(tableau[ties + 1, pivot_col])] + 1
+
+        # Fall back to Bland's rule when degenerate pivots start to cycle
+        degenerate_pivots = degenerate_pivots + 1 if ratios[pivot_row - 1] < eps else 0
+        if degenerate_pivots > max_degenerate_pivots:
+            use_bland = True
+        if observer:
+            phases.lap('ratio test')
+
+        # Normalize the pivot row and eliminate the pivot column elsewhere
+        tableau[pivot_row] /= tableau[pivot_row, pivot_col]
+        pivot_line = tableau[pivot_row].copy()
+        tableau -= np.outer(tableau[:, pivot_col], pivot_line)
+        tableau[pivot_row] = pivot_line
+        basis[pivot_row - 1] = pivot_col
+
+        if observer:
+            phases.lap('pivoting')
+            # The ratio test keeps the right-hand side nonnegative, so the
+            # primal residual only shows rounding
+            observer({'iteration': iteration, 'objective': tableau[0, -1], 'step': ratios[pivot_row - 1],
+                      'pivot_row': pivot_row - 1, 'pivot_col': pivot_col,
+                      'primal_residual': np.sum(np.maximum(-tableau[1:, -1], 0)), 'dual_residual': dual_residual,
+                      'times': phases.times})
 
     # Solution extraction
     solution = np.zeros(num_vars)
-    for i in range(num_vars):
-        col = tableau[1:, i]
-        if np.count_nonzero(col) == 1 and np.isclose(np.max(col), 1):
-            basic_row = np.where(col == 1)[0][0] + 1
-            solution[i] = tableau[basic_row, -1]
+    structural = basis < num_vars
+    solution[basis[structural]] = tableau[1:, -1][structural]
 
     # Calculate objective value
     objective_value = tableau[0, -1]
     filtered = [(i, sol) for (i, sol) in list(enumerate(solution)) if abs(sol) > eps]
-    return filtered, objective_value
+    return Result(filtered, objective_value, iterations=iteration, basis=basis)
 
 # Utility functions
 def non_zero_presence(row, eps):
     return np.any(row < -eps)
 
 def check_boundedness(ratios, eps):
-    if np.all(np.isinf(ratios)):
-        print("The method is not applicable.")
-        return True
-    return False
-
-def check_degenerate(ratios):
-    for i, x in enumerate(ratios):
-        for j, y in enumerate(ratios):
-            if i != j and x == y and x == np.min(ratios):
-                return True
-    return False
-    
\ No newline at end of file
+    return np.all(np.isinf(ratios))
+
+def ratio_test(rhs, col, eps):
+    # Only rows with a positive pivot element limit the step
+    ratios = np.full(rhs.size, np.inf)
+    positive = col > eps
+    ratios[positive] = rhs[positive] / col[positive]
+    return ratios
+
+def check_degenerate(ratios, eps):
+    # Rows tied for the minimum ratio
+    return np.where(ratios - np.min(ratios) <= eps)[0]
+
+# Pricing rules: pick the entering column from the objective row
+def dantzig_pricing(tableau, eps):
+    return np.argmin(tableau[0, :-1])
+
+def bland_pricing(tableau, eps):
+    return np.argmax(tableau[0, :-1] < -eps)
+
+def steepest_edge_pricing(tableau, eps):
+    # Reduced cost per unit length of the edge in the space of all variables
+    candidates = np.where(tableau[0, :-1] < -eps)[0]
+    norms = np.sqrt(1 + np.sum(tableau[1:, candidates] ** 2, axis=0))
+    return candidates[np.argmin(tableau[0, candidates] / norms)]
+
+pricing_rules = {
+    'dantzig': dantzig_pricing,
+    'bland': bland_pricing,
+    'steepest': steepest_edge_pricing,
+}
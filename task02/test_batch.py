@@ -0,0 +1,47 @@
+import numpy as np
+
+import samples
+from batch import solve_batch
+from interior import interior_point
+
+
+def perturbed_samples(rng, count, scale):
+    # Random perturbations of first_sample, a mix of optimal, unbounded and
+    # not applicable (no interior start) problems
+    base = samples.first_sample
+    problems = []
+    for _ in range(count):
+        problems.append({
+            'A': np.array(base['A']) + rng.normal(0, scale, (3, 6)),
+            'b': np.array(base['b']) + rng.normal(0, scale * 5, 3),
+            'C': np.array(base['C']) + rng.normal(0, scale, 6),
+            'is_max': bool(rng.integers(2))})
+    return problems
+
+
+def test_batch_matches_interior_point():
+    # Test: every lane of the batch gives the same status, iterations,
+    # solution and objective as interior_point on the same sample
+    rng = np.random.default_rng(0)
+    statuses = set()
+    for scale in (0.05, 0.5, 1.0):
+        problems = perturbed_samples(rng, 40, scale)
+        for problem, result in zip(problems, solve_batch(problems)):
+            expected = interior_point(problem)
+            statuses.add(expected.status)
+            assert result.status == expected.status, (result.status, expected.status)
+            assert result.iterations == expected.iterations
+            if expected:
+                assert result[0] == expected[0] and result[1] == expected[1]
+    assert {'optimal', 'unbounded'} <= statuses
+    print(
+        f"Test - statuses: {sorted(statuses)}")
+
+
+def main():
+    print("Running Batch Tests:")
+    test_batch_matches_interior_point()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import numpy as np
+from scipy import sparse
+
+from cache import cached, sample_key
+from simplex import simplex
+from solution_cache import SolutionCache
+
+
+def test_cached_simplex():
+    # Test: a repeated sample is a hit with the same result, and an unsorted
+    # CSR sample keys like its dense form without being sorted itself
+    cache = SolutionCache()
+    solve = cached(simplex, cache)
+    sample = {'A': [[1, 1], [2, 1]], 'b': [4, 6], 'C': [3, 2], 'is_max': True}
+    first, second = solve(sample), solve(sample)
+    assert first and second and second[1] == first[1] and second.basis.tolist() == list(first.basis)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    A = sparse.csr_matrix((np.array([1.0, 1.0, 1.0, 2.0]), np.array([1, 0, 1, 0]), np.array([0, 2, 4])), shape=(2, 2))
+    indices = A.indices.copy()
+    unsorted = dict(sample, A=A)
+    assert sample_key(unsorted, simplex, {}) == sample_key(dict(sample, A=sparse.csr_matrix(sample['A'])), simplex, {})
+    assert np.array_equal(A.indices, indices)
+    print(
+        f"Test - cache: {cache.stats()}")
+
+
+def main():
+    print("Running Cache Tests:")
+    test_cached_simplex()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+
+import numpy as np
+
+from mps import read_mps, write_mps
+
+
+def test_round_trip():
+    # Test: a sample with rows of every kind and bounds reads back the same
+    # from free and fixed format
+    rng = np.random.default_rng(0)
+    A = rng.uniform(-10, 10, (6, 5)) * (rng.uniform(size=(6, 5)) < 0.6)
+    sample = {
+        'A': A,
+        'b': rng.uniform(1, 10, 6),
+        'C': rng.uniform(1, 10, 5) / 3,
+        'is_max': True,
+        'constraints': ['<=', '>=', '=', '<=', '>=', '<='],
+        'bounds': [(0.0, None), (None, None), (1.5, 1.5), (None, 4.0), (-2.0, 7.0)],
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for fixed in (False, True):
+            path = os.path.join(directory, 'sample.mps')
+            write_mps(sample, path, fixed=fixed)
+            read = read_mps(path, fixed=fixed)
+            # Fixed format keeps 12 characters of every number
+            tolerance = 1e-9 if fixed else 0
+            assert np.allclose(read['A'].toarray(), sample['A'], rtol=tolerance, atol=0)
+            assert np.allclose(read['b'], sample['b'], rtol=tolerance, atol=0)
+            assert np.allclose(read['C'], sample['C'], rtol=tolerance, atol=0)
+            assert read['is_max'] and read['constraints'] == sample['constraints']
+            assert read['bounds'] == sample['bounds']
+            if fixed:
+                with open(path) as file:
+                    assert all(len(line.rstrip('\n')) <= 36 for line in file)
+    print("Test - MPS round trip: free and fixed format")
+
+
+def test_fixed_names():
+    # Test: names that do not fit fixed format are rejected, free format
+    # writes them
+    sample = {'A': np.ones((1, 2)), 'b': [1.0], 'C': [1.0, 1.0], 'is_max': True}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'sample.mps')
+        for name in ('with space', 'too_long_name'):
+            try:
+                write_mps(sample, path, name=name, fixed=True)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"fixed format accepted {name!r}")
+            write_mps(sample, path, name=name)
+            assert np.allclose(read_mps(path)['A'].toarray(), sample['A'])
+    print("Test - MPS fixed format names: rejected")
+
+
+def test_fixed_spaces():
+    # Test: fixed format names with spaces, read by column
+    text = """NAME          SPACED
+ROWS
+ N  COST
+ L  LIM 1
+ G  LIM 2
+COLUMNS
+    X ONE     COST               1.0   LIM 1              2.5
+    X ONE     LIM 2              1.0
+    X TWO     COST               3.0   LIM 2              1.0
+RHS
+    RHS       LIM 1              8.0   LIM 2              2.0
+BOUNDS
+ UP BND       X TWO              5.0
+ENDATA
+"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'spaced.mps')
+        with open(path, 'w') as file:
+            file.write(text)
+        read = read_mps(path, fixed=True)
+    assert np.array_equal(read['A'].toarray(), [[2.5, 0.0], [1.0, 1.0]])
+    assert np.array_equal(read['b'], [8.0, 2.0]) and np.array_equal(read['C'], [1.0, 3.0])
+    assert read['constraints'] == ['<=', '>='] and read['bounds'] == [(0.0, None), (0.0, 5.0)]
+    print("Test - MPS fixed format names with spaces: read")
+
+
+def main():
+    print("Running MPS Tests:")
+    test_round_trip()
+    test_fixed_names()
+    test_fixed_spaces()
+
+
+if __name__ == "__main__":
+    main()
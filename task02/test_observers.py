@@ -0,0 +1,45 @@
+from interior import interior_point
+from primal_dual import primal_dual
+from revised import revised_simplex
+from simplex import simplex
+import samples
+
+
+def test_observer_keys():
+    # Test: every LP solver reports the same core keys for each iteration
+    sample = {'A': [[1, 1], [2, 1]], 'b': [4, 6], 'C': [3, 2], 'is_max': True}
+    keys = {'iteration', 'objective', 'step', 'primal_residual', 'dual_residual', 'times'}
+    for solver in (simplex, revised_simplex, interior_point, primal_dual):
+        records = []
+        result = solver(sample, observer=records.append)
+        assert result and records
+        assert all(keys <= set(record) for record in records), solver.__name__
+        assert all(record['dual_residual'] >= 0 for record in records)
+    print(
+        f"Test - keys: {sorted(keys)}")
+
+
+def test_unbounded_status():
+    # Test: the unbounded third sample is reported as unbounded, not
+    # infeasible, after some observed iterations; the infeasible second
+    # one as infeasible where the method applies
+    for solver in (simplex, revised_simplex, interior_point, primal_dual):
+        records = []
+        result = solver(samples.third_sample, observer=records.append)
+        assert result.status == 'unbounded' and not result, (solver.__name__, result.status)
+        assert len(records) <= result.iterations
+    for solver in (simplex, revised_simplex, primal_dual):
+        assert solver(samples.second_sample).status == 'infeasible', solver.__name__
+    assert interior_point(samples.second_sample).status == 'not applicable'
+    print(
+        f"Test - third sample: unbounded, second sample: infeasible")
+
+
+def main():
+    print("Running Observer Tests:")
+    test_observer_keys()
+    test_unbounded_status()
+
+
+if __name__ == "__main__":
+    main()
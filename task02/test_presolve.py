@@ -0,0 +1,57 @@
+import numpy as np
+from scipy import sparse
+
+from interior import interior_point
+from presolve import presolve_and_solve
+from primal_dual import primal_dual
+from simplex import simplex
+
+
+def sample_with_reductions(rng):
+    # Feasible max C x, A x <= b with a singleton row and a duplicate row,
+    # the reductions that give the reduced problem bounds and row ranges
+    A = rng.uniform(1, 10, (6, 5))
+    A[0] = 0
+    A[0, 2] = 2
+    A[1] = 2 * A[3]
+    b = A.sum(axis=1) + rng.uniform(1, 10, 6)
+    b[1] = 2 * b[3]
+    return {'A': A, 'b': b, 'C': rng.uniform(1, 10, 5), 'is_max': True}
+
+
+def test_presolve_interior_methods():
+    # Test: presolve in front of the interior methods still solves, with
+    # the simplex objective
+    rng = np.random.default_rng(0)
+    for _ in range(16):
+        sample = sample_with_reductions(rng)
+        expected = simplex(sample)
+        for solver in (interior_point, primal_dual):
+            result = presolve_and_solve(sample, solver=solver)
+            assert result, result.status
+            assert np.isclose(result[1], expected[1], rtol=1e-3)
+    print(
+        f"Test - objective: {result[1]}, simplex: {expected[1]}")
+
+
+def test_presolve_keeps_input():
+    # Test: a float CSR sample with an explicit zero is left as it was
+    A = sparse.csr_matrix((np.array([1.0, 0.0, 2.0]), np.array([0, 1, 1]), np.array([0, 2, 3])), shape=(2, 2))
+    sample = {'A': A, 'b': np.array([4.0, 6.0]), 'C': np.array([1.0, 1.0]), 'is_max': True}
+    data, indices, indptr = A.data.copy(), A.indices.copy(), A.indptr.copy()
+    result = presolve_and_solve(sample)
+    assert result and np.isclose(result[1], 7)
+    assert A.nnz == 3
+    assert np.array_equal(A.data, data) and np.array_equal(A.indices, indices) and np.array_equal(A.indptr, indptr)
+    print(
+        f"Test - A.nnz after presolve: {A.nnz}")
+
+
+def main():
+    print("Running Presolve Tests:")
+    test_presolve_interior_methods()
+    test_presolve_keeps_input()
+
+
+if __name__ == "__main__":
+    main()
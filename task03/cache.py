@@ -0,0 +1,89 @@
+import os
+import sys
+
+import numpy as np
+from scipy import sparse
+
+from main import Plan, TransportationTable, optimal_transportation, vogel_approximation_method
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common'))
+
+from solution_cache import SolutionCache, solver_digest, update_array, update_sparse
+
+
+def cached_method(method, cache: SolutionCache):
+    # An approximation method behind the cache: returns the Plan and sets
+    # table.allocation like method; a hit does both without calling it (or
+    # the observer)
+    def run(table: TransportationTable, observer=None) -> Plan:
+        key = table_key(table, method)
+        entry = cache.get(key)
+        if entry is not None:
+            plan = plan_from(entry)
+            table.allocation = plan[0]
+            return plan
+
+        plan = method(table, observer)
+        cache.put(key, plan_entry(plan))
+        return plan
+
+    run.cache = cache
+    return run
+
+
+def cached_optimal(cache: SolutionCache, method=vogel_approximation_method):
+    # main.optimal_transportation behind the cache, failed plans included
+    def run(table: TransportationTable, observer=None) -> Plan:
+        key = table_key(table, optimal_transportation, method)
+        entry = cache.get(key)
+        if entry is not None:
+            return plan_from(entry)
+
+        plan = optimal_transportation(table, method, observer)
+        cache.put(key, plan_entry(plan))
+        return plan
+
+    run.cache = cache
+    return run
+
+
+def table_key(table: TransportationTable, *solvers) -> str:
+    # Digest of costs, supplies and demands with the methods used. A sparse
+    # table is hashed apart from a dense one, since its stored entries are
+    # the routes.
+    digest = solver_digest(*solvers)
+    if sparse.issparse(table.costs):
+        update_sparse(digest, table.costs)
+    else:
+        update_array(digest, table.costs)
+    update_array(digest, table.supplies)
+    update_array(digest, table.demands)
+    return digest.hexdigest()
+
+
+def plan_entry(plan: Plan) -> dict:
+    # A failed plan stores only its status and iterations
+    entry = {'status': np.array(plan.status), 'iterations': np.array(plan.iterations)}
+    if not plan:
+        return entry
+    allocation, entry['answer'] = plan[0], np.array(plan[1])
+    if sparse.issparse(allocation):
+        entry['data'] = allocation.data.copy()
+        entry['indices'] = allocation.indices.copy()
+        entry['indptr'] = allocation.indptr.copy()
+        entry['shape'] = np.array(allocation.shape)
+    else:
+        entry['allocation'] = np.array(allocation)
+    return entry
+
+
+def plan_from(entry: dict) -> Plan:
+    status = str(entry['status'][()])
+    iterations = int(entry['iterations'][()])
+    if 'answer' not in entry:
+        return Plan(status=status, iterations=iterations)
+    if 'allocation' in entry:
+        allocation = entry['allocation']
+    else:
+        allocation = sparse.csr_matrix((entry['data'], entry['indices'], entry['indptr']), shape=tuple(entry['shape']))
+    return Plan(allocation, entry['answer'][()], status=status, iterations=iterations)
@@ -0,0 +1,87 @@
+import os
+
+import numpy as np
+
+# Reproducible transportation instances. Every part of an instance draws
+# from its own numpy Generator, seeded by a SeedSequence spawned from the
+# seed with a fixed key (instance, part[, block]). Costs are drawn in
+# blocks of block_rows rows, one stream per block, so an instance is the
+# same built in memory or streamed to disk, and any block can be made on
+# its own.
+block_rows = 1024
+
+
+def random_arrays(sources_number, destinations_number, seed=None, instance=0, max_supply=50, max_cost=600,
+                  dtype=np.int64) -> tuple:
+    # Costs in [1, max_cost), supplies in [1, max_supply] and demands that
+    # balance them
+    seed = resolve_seed(seed)
+    supplies, demands = random_capacities(sources_number, destinations_number, seed, instance, max_supply)
+    costs = np.empty((sources_number, destinations_number), dtype)
+    for start, block in cost_blocks(sources_number, destinations_number, seed, instance, max_cost, dtype):
+        costs[start:start + len(block)] = block
+    return costs, supplies, demands
+
+
+def random_capacities(sources_number, destinations_number, seed, instance=0, max_supply=50) -> tuple:
+    # Demands split the total supply at random; every destination gets at
+    # least one unit while the total allows it
+    supplies = stream(seed, instance, 0).integers(1, max_supply + 1, sources_number)
+    total = int(supplies.sum())
+    floor = 1 if total >= destinations_number else 0
+    shares = np.full(destinations_number, 1 / destinations_number)
+    demands = stream(seed, instance, 1).multinomial(total - floor * destinations_number, shares) + floor
+    return supplies, demands
+
+
+def cost_blocks(sources_number, destinations_number, seed, instance=0, max_cost=600, dtype=np.int64):
+    # (first row, block) pairs of the cost matrix, top to bottom
+    for k, start in enumerate(range(0, sources_number, block_rows)):
+        rows = min(block_rows, sources_number - start)
+        yield start, stream(seed, instance, 2, k).integers(1, max_cost, (rows, destinations_number), dtype=dtype)
+
+
+def write_instance(path, sources_number, destinations_number, seed=None, instance=0, max_supply=50,
+                   max_cost=600, dtype=np.int64) -> str:
+    # Streams an instance into path/costs.npy, supplies.npy and demands.npy;
+    # the costs go block by block into a memory-mapped .npy, so an instance
+    # larger than memory can be written
+    seed = resolve_seed(seed)
+    os.makedirs(path, exist_ok=True)
+    supplies, demands = random_capacities(sources_number, destinations_number, seed, instance, max_supply)
+    np.save(os.path.join(path, 'supplies.npy'), supplies)
+    np.save(os.path.join(path, 'demands.npy'), demands)
+
+    costs = np.lib.format.open_memmap(os.path.join(path, 'costs.npy'), mode='w+', dtype=dtype,
+                                      shape=(sources_number, destinations_number))
+    for start, block in cost_blocks(sources_number, destinations_number, seed, instance, max_cost, dtype):
+        costs[start:start + len(block)] = block
+    costs.flush()
+    del costs
+    return path
+
+
+def write_instances(directory, count, sources_number, destinations_number, seed=None, **options) -> list:
+    # count instances in directory/instance_0000, ..., one stream each
+    seed = resolve_seed(seed)
+    return [write_instance(os.path.join(directory, f'instance_{k:04d}'), sources_number, destinations_number,
+                           seed, k, **options)
+            for k in range(count)]
+
+
+def load_instance(path, mmap=True) -> tuple:
+    # (costs, supplies, demands) of a written instance, memory-mapped
+    # read-only unless mmap is False; tables take them without copying
+    mode = 'r' if mmap else None
+    return tuple(np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mode)
+                 for name in ('costs', 'supplies', 'demands'))
+
+
+# Utility functions
+def stream(seed, *key) -> np.random.Generator:
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=key))
+
+
+def resolve_seed(seed) -> int:
+    # All parts of an unseeded instance have to share one fresh entropy
+    return np.random.SeedSequence().entropy if seed is None else seed
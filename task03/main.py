@@ -1,216 +1,937 @@
-import numpy as np
-import random
+import os
+import sys
+import time
 
+import numpy as np
+from scipy import sparse
 
-class TransportationTable:
-    def __init__(self, sources_number: int = 3, destinations_number: int = 4):
-        self.destinations_number: int = destinations_number
-        self.sources_number: int = sources_number
-        self.supplies = np.array([random.randint(1, 50)
-                                 for _ in range(sources_number)])
-        self.demands = self.generate_demands()
-        self.costs = self.generate_costs()
+from generator import load_instance, random_arrays
 
-    def generate_demands(self):
-        supplies_sum: int = sum(self.supplies)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common'))
 
-        demands = np.zeros(self.destinations_number, dtype=int)
+import solve_result
 
-        demands[0] = random.randint(1, supplies_sum // 2)
-        demands[1]: int = random.randint(
-            1 if sum(demands) != supplies_sum else 0, supplies_sum - sum(demands))
-        demands[2]: int = random.randint(
-            1 if sum(demands) != supplies_sum else 0, supplies_sum - sum(demands))
-        demands[3]: int = supplies_sum - sum(demands)
 
-        return demands
+class Plan(solve_result.Result):
+    # (allocation, cost) of a transportation method with its status and
+    # number of iterations (allocations or u-v pivots). The approximation
+    # methods give a 'feasible' plan and optimal_transportation an 'optimal'
+    # one. A method fails with 'not applicable' when its greedy choices cut
+    # some capacity off from every route, optimal_transportation with
+    # 'infeasible' when the routes cannot carry all the capacity and with
+    # 'iteration limit' when the u-v method runs out of pivots. Unbalanced
+    # tables are not a failure: they get a dummy source or destination.
+    solved = ('optimal', 'feasible')
+    messages = {
+        'not applicable': "The method is not applicable!",
+        'infeasible': "The routes cannot carry all the capacity!",
+        'iteration limit': "The iteration limit was reached!",
+    }
 
-    def generate_costs(self):
-        costs = np.random.randint(1, 600, size=(
-            self.sources_number, self.destinations_number))
 
-        return costs
+class TransportationTable:
+    # Costs and capacities are stored read-only. The methods keep what is
+    # left of a table in their own capacity copies and boolean row and
+    # column liveness masks, so any number of them can run on one instance.
+    #
+    # Costs are either a dense matrix, where every route is allowed, or a
+    # sparse matrix whose stored entries are the allowed routes.
+    #
+    # A new table is a random balanced one, reproducible for a given seed
+    # (see generator.py).
+    def __init__(self, sources_number: int = 3, destinations_number: int = 4, seed=None, instance: int = 0):
+        self.costs, self.supplies, self.demands = random_arrays(sources_number, destinations_number, seed, instance)
+        self.allocation = None
+
+    @property
+    def costs(self) -> np.ndarray:
+        return self._costs
+
+    @costs.setter
+    def costs(self, costs):
+        if sparse.issparse(costs):
+            costs = sparse.csr_matrix(costs)
+            costs.sum_duplicates()
+            for values in (costs.data, costs.indices, costs.indptr):
+                values.flags.writeable = False
+            self._costs = costs
+        else:
+            self._costs = read_only(costs)
+
+    @property
+    def supplies(self) -> np.ndarray:
+        return self._supplies
+
+    @supplies.setter
+    def supplies(self, supplies):
+        self._supplies = read_only(supplies)
+
+    @property
+    def demands(self) -> np.ndarray:
+        return self._demands
+
+    @demands.setter
+    def demands(self, demands):
+        self._demands = read_only(demands)
+
+    @property
+    def is_sparse(self) -> bool:
+        return sparse.issparse(self.costs)
+
+    @property
+    def sources_number(self) -> int:
+        return len(self.supplies)
+
+    @property
+    def destinations_number(self) -> int:
+        return len(self.demands)
+
+    @classmethod
+    def from_arrays(cls, costs, supplies, demands):
+        # Table over given arrays, without generating random ones first
+        table = cls.__new__(cls)
+        table.costs, table.supplies, table.demands = costs, supplies, demands
+        table.allocation = None
+        return table
+
+    @classmethod
+    def from_routes(cls, supplies, demands, sources, destinations, costs):
+        # Table over an edge list: route k goes from sources[k] to
+        # destinations[k] at costs[k], every other pair is forbidden
+        costs = sparse.csr_matrix((costs, (sources, destinations)), shape=(len(supplies), len(demands)))
+        return cls.from_arrays(costs, supplies, demands)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        # Table over an instance written by generator.write_instance,
+        # memory-mapped without copying
+        return cls.from_arrays(*load_instance(path, mmap))
+
+    def routes(self) -> tuple:
+        # Allowed routes as a CSR matrix with working copies of the
+        # capacities. An unbalanced table gets a dummy destination (or
+        # source) taking the excess, appended as one sparse column (or row)
+        # of zero-cost routes
+        m, n = self.costs.shape
+        if self.is_sparse:
+            costs = self.costs
+        else:
+            costs = sparse.csr_matrix((self.costs.ravel(), np.tile(np.arange(n), m), np.arange(0, m * n + 1, n)),
+                                      shape=(m, n))
+        supplies, demands = self.supplies.copy(), self.demands.copy()
+
+        excess = np.sum(supplies) - np.sum(demands)
+        if excess > 0:
+            dummy = sparse.csr_matrix((np.zeros(m, dtype=costs.dtype), (np.arange(m), np.zeros(m, dtype=int))),
+                                      shape=(m, 1))
+            costs = sparse.hstack((costs, dummy), format='csr')
+            demands = np.append(demands, excess)
+        elif excess < 0:
+            dummy = sparse.csr_matrix((np.zeros(n, dtype=costs.dtype), (np.zeros(n, dtype=int), np.arange(n))),
+                                      shape=(1, n))
+            costs = sparse.vstack((costs, dummy), format='csr')
+            supplies = np.append(supplies, -excess)
+
+        costs.sort_indices()
+        return costs, supplies, demands
+
+    def remaining(self) -> tuple:
+        # Working copies of the capacities with the live row and column
+        # masks; the cost matrix itself is never copied
+        supplies, demands = self.supplies.copy(), self.demands.copy()
+        return supplies, demands, supplies > 0, demands > 0
 
     def print_table(self):
+        # Forbidden routes of a sparse table are shown as '-'
         for i in range(self.sources_number):
+            if self.is_sparse:
+                start, end = self.costs.indptr[i], self.costs.indptr[i + 1]
+                row = dict(zip(self.costs.indices[start:end], self.costs.data[start:end]))
+            else:
+                row = dict(enumerate(self.costs[i]))
             for j in range(self.destinations_number):
-                print(f'{self.costs[i][j]: 4}', end=" ")
+                print(f'{row[j]: 4}' if j in row else '   -', end=" ")
             print(f'{self.supplies[i]: 4}')
 
         for i in range(self.destinations_number):
             print(f'{self.demands[i]: 4}', end=" ")
 
 
-def set_zeros_horizontally(row: int, table: TransportationTable):
-    for j in range(table.destinations_number):
-        table.costs[row][j] = 0
-
-
-def set_zeros_vertically(column: int, table: TransportationTable):
-    for i in range(table.sources_number):
-        table.costs[i][column] = 0
+def read_only(values) -> np.ndarray:
+    # Arrays that are read-only already (e.g. views of shared memory) are
+    # kept as they are, anything else is copied
+    if isinstance(values, np.ndarray) and not values.flags.writeable:
+        return values
+    values = np.array(values)
+    values.flags.writeable = False
+    return values
 
 
 def is_balanced(table: TransportationTable) -> bool:
     return sum(table.supplies) == sum(table.demands)
 
 
-def north_west_corner_method(table: TransportationTable) -> int:
-    if not is_balanced(table):
-        print("The method is not applicable!")
-        return None
+def north_west_corner_method(table: TransportationTable, observer=None) -> Plan:
+    # Every method returns its Plan and keeps the allocation in
+    # table.allocation (None when it cannot place all the capacity). An
+    # observer is called with a record of every allocation: the cell, the
+    # amount placed and the cost so far.
+
+    # Forbidden routes or a dummy line need the route version
+    if table.is_sparse or not is_balanced(table):
+        return route_method(table, route_north_west_corner, observer)
 
     answer: int = 0
+    supplies, demands, _, _ = table.remaining()
+    table.allocation = np.zeros(table.costs.shape, dtype=int)
+
+    # Walk from the top-left cell, stepping down when a row is exhausted
+    # and right when a column is
+    i, j = 0, 0
+    while i < table.sources_number and j < table.destinations_number:
+        replacement = min(supplies[i], demands[j])
+        answer += table.costs[i][j] * replacement
+        table.allocation[i][j] = replacement
+        supplies[i] -= replacement
+        demands[j] -= replacement
+        if observer:
+            observer({'iteration': i + j + 1, 'pivot_row': i, 'pivot_col': j, 'step': replacement,
+                      'objective': answer})
+
+        if supplies[i] == 0:
+            i += 1
+        else:
+            j += 1
+
+    return Plan(table.allocation, answer, status='feasible', iterations=i + j)
+
 
-    for i in range(table.sources_number):
-        for j in range(table.destinations_number):
-            if table.costs[i][j] > 0:
-                if table.supplies[i] > table.demands[j]:
-                    answer += table.costs[i][j] * table.demands[j]
-                    table.supplies[i] -= table.demands[j]
-                    table.demands[j] = 0
-                    set_zeros_vertically(j, table)
-                elif table.supplies[i] < table.demands[j]:
-                    answer += table.costs[i][j] * table.supplies[i]
-                    table.demands[j] -= table.supplies[i]
-                    table.supplies[i] = 0
-                    set_zeros_horizontally(i, table)
-                else:
-                    answer += table.costs[i][j] * table.demands[j]
-                    table.supplies[i] = 0
-                    table.demands[j] = 0
-                    set_zeros_horizontally(i, table)
-                    set_zeros_vertically(j, table)
-
-    return answer
-
-
-def vogel_approximation_method(table: TransportationTable) -> int:
-    if not is_balanced(table):
-        print("The method is not applicable!")
-        return None
+def vogel_approximation_method(table: TransportationTable, observer=None) -> Plan:
+    if table.is_sparse or not is_balanced(table):
+        return route_method(table, route_vogel, observer)
 
     answer: int = 0
+    costs = table.costs
+    m, n = costs.shape
+    supplies, demands, live_rows, live_columns = table.remaining()
+    table.allocation = np.zeros((m, n), dtype=int)
+
+    # Every row keeps its columns presorted by cost (and every column its
+    # rows) with positions of its two cheapest live entries; a deleted row
+    # or column only moves the pointers of the lines that pointed at it
+    row_order = np.argsort(costs, axis=1, kind='stable')
+    column_order = np.argsort(costs.T, axis=1, kind='stable')
+    row_first, row_second = np.zeros(m, dtype=int), np.zeros(m, dtype=int)
+    column_first, column_second = np.zeros(n, dtype=int), np.zeros(n, dtype=int)
+    rows_values, column_values = np.full(m, -np.inf), np.full(n, -np.inf)
+    update_penalties(costs, row_order, row_first, row_second, live_columns, rows_values,
+                     np.flatnonzero(live_rows))
+    update_penalties(costs.T, column_order, column_first, column_second, live_rows, column_values,
+                     np.flatnonzero(live_columns))
+
+    iteration = 0
+    while True:
+        row, column = np.argmax(rows_values), np.argmax(column_values)
+        max_row_value, max_column_value = rows_values[row], column_values[column]
+        if max_row_value == -np.inf or max_column_value == -np.inf:
+            break
+        iteration += 1
 
-    while np.any(table.supplies > 0) and np.any(table.demands > 0):
-        rows_values = []
-        for i in range(table.sources_number):
-            valid_costs = table.costs[i, table.demands > 0]
-            valid_costs = valid_costs[valid_costs != 1e9]
-            if len(valid_costs) > 1:
-                sorted_costs = np.sort(valid_costs)
-                penalty = sorted_costs[1] - sorted_costs[0]
-            else:
-                penalty = 0
-            rows_values.append(penalty)
-
-        column_values = []
-        for j in range(table.destinations_number):
-            valid_costs = table.costs[table.supplies > 0, j]
-            valid_costs = valid_costs[valid_costs != 1e9]
-            if len(valid_costs) > 1:
-                sorted_costs = np.sort(valid_costs)
-                penalty = sorted_costs[1] - sorted_costs[0]
-            else:
-                penalty = 0
-            column_values.append(penalty)
+        if max_row_value >= max_column_value:
+            column = row_order[row, row_first[row]]
+        else:
+            row = column_order[column, column_first[column]]
+
+        replacement = min(supplies[row], demands[column])
+        answer += replacement * costs[row, column]
+        table.allocation[row, column] += replacement
+        supplies[row] -= replacement
+        demands[column] -= replacement
+        if observer:
+            observer({'iteration': iteration, 'pivot_row': row, 'pivot_col': column, 'step': replacement,
+                      'objective': answer})
+
+        if supplies[row] == 0:
+            live_rows[row] = False
+            rows_values[row] = -np.inf
+            update_penalties(costs.T, column_order, column_first, column_second, live_rows, column_values,
+                             pointing_at(row, column_order, column_first, column_second, live_columns))
+        if demands[column] == 0:
+            live_columns[column] = False
+            column_values[column] = -np.inf
+            update_penalties(costs, row_order, row_first, row_second, live_columns, rows_values,
+                             pointing_at(column, row_order, row_first, row_second, live_rows))
+
+    return Plan(table.allocation, answer, status='feasible', iterations=iteration)
+
+
+def russel_approximation_method(table: TransportationTable, observer=None) -> Plan:
+    if table.is_sparse or not is_balanced(table):
+        return route_method(table, route_russell, observer)
 
-        max_row_value, max_column_value = max(rows_values), max(column_values)
+    answer = 0
+    costs = table.costs
+    supplies, demands, live_rows, live_columns = table.remaining()
+    table.allocation = np.zeros(costs.shape, dtype=int)
+
+    iteration = 0
+    while np.any(live_rows) and np.any(live_columns):
+        valid_row_indexes = np.flatnonzero(live_rows)
+        valid_column_indexes = np.flatnonzero(live_columns)
+        live_costs = costs[np.ix_(valid_row_indexes, valid_column_indexes)]
+
+        # delta_ij = c_ij - u_i - v_j with the row and column maxima over
+        # the live cells
+        max_row_values = np.max(live_costs, axis=1)
+        max_column_values = np.max(live_costs, axis=0)
+        temp_table = live_costs - max_row_values[:, None] - max_column_values[None, :]
+
+        # Every cell tied for the most negative delta, in row-major order
+        min_negative_indexes = np.argwhere(temp_table == np.min(temp_table))
+
+        for i, j in min_negative_indexes:
+            row, column = valid_row_indexes[i], valid_column_indexes[j]
+            replacement = min(supplies[row], demands[column])
+            answer += replacement * costs[row, column]
+            table.allocation[row, column] += replacement
+
+            supplies[row] -= replacement
+            demands[column] -= replacement
+            iteration += 1
+            if observer:
+                observer({'iteration': iteration, 'pivot_row': row, 'pivot_col': column, 'step': replacement,
+                          'objective': answer})
+
+            if supplies[row] == 0:
+                live_rows[row] = False
+            if demands[column] == 0:
+                live_columns[column] = False
+
+    return Plan(table.allocation, answer, status='feasible', iterations=iteration)
+
+
+def update_penalties(costs: np.ndarray, order: np.ndarray, first: np.ndarray, second: np.ndarray,
+                     live: np.ndarray, penalties: np.ndarray, lines: np.ndarray):
+    # Moves the two cheapest-live pointers of the given lines (rows of costs
+    # and order) past deleted entries and refreshes their penalties; a line
+    # with a single live entry left has penalty 0
+    first[lines] = skip_deleted(order, first[lines], live, lines)
+    second[lines] = skip_deleted(order, np.maximum(second[lines], first[lines] + 1), live, lines)
+
+    penalties[lines] = 0
+    two = lines[second[lines] < order.shape[1]]
+    penalties[two] = costs[two, order[two, second[two]]] - costs[two, order[two, first[two]]]
+
+
+def skip_deleted(order: np.ndarray, positions: np.ndarray, live: np.ndarray, lines: np.ndarray) -> np.ndarray:
+    # First position at or after the given ones holding a live entry, or the
+    # line length when nothing is left
+    length = order.shape[1]
+    positions = positions.copy()
+    pending = np.arange(lines.size)
+    while pending.size:
+        at = positions[pending]
+        inside = at < length
+        deleted = np.zeros(pending.size, dtype=bool)
+        deleted[inside] = ~live[order[lines[pending[inside]], at[inside]]]
+        pending = pending[deleted]
+        positions[pending] += 1
+
+    return positions
+
+
+def pointing_at(index: int, order: np.ndarray, first: np.ndarray, second: np.ndarray,
+                live: np.ndarray) -> np.ndarray:
+    # Live lines whose two cheapest entries include the deleted index
+    lines = np.flatnonzero(live)
+    length = order.shape[1]
+    first_entry = order[lines, np.minimum(first[lines], length - 1)]
+    second_entry = order[lines, np.minimum(second[lines], length - 1)]
+    return lines[(first_entry == index) | (second_entry == index)]
+
+
+def route_method(table: TransportationTable, method, observer=None) -> Plan:
+    # Runs the route version of a method on the balanced routes of a table.
+    # It returns the amount on every route with its number of allocations
+    # and uses up the capacities; any capacity left means the greedy
+    # choices cut it off from every route, and the method is not applicable
+    costs, supplies, demands = table.routes()
+    amounts, iterations = method(costs, supplies, demands, observer)
+    if np.any(supplies > 0):
+        table.allocation = None
+        return Plan(status='not applicable', iterations=iterations)
+
+    table.allocation, answer = route_plan(table, costs, amounts)
+    return Plan(table.allocation, answer, status='feasible', iterations=iterations)
+
+
+def route_north_west_corner(costs: sparse.csr_matrix, supplies: np.ndarray, demands: np.ndarray,
+                            observer=None) -> tuple:
+    # Every source in turn fills its allowed destinations from left to right
+    rows, columns, values = route_lists(costs)
+    amounts = np.zeros(costs.nnz, dtype=np.result_type(supplies, demands))
+    answer = 0
+
+    for route, (row, column) in enumerate(zip(rows.tolist(), columns.tolist())):
+        replacement = min(supplies[row], demands[column])
+        amounts[route] = replacement
+        supplies[row] -= replacement
+        demands[column] -= replacement
+        if observer:
+            answer += replacement * values[route]
+            observer({'iteration': route + 1, 'pivot_row': row, 'pivot_col': column, 'step': replacement,
+                      'objective': answer})
+
+    return amounts, costs.nnz
+
+
+def route_vogel(costs: sparse.csr_matrix, supplies: np.ndarray, demands: np.ndarray, observer=None) -> tuple:
+    # Vogel's method as in vogel_approximation_method, with every row and
+    # column keeping its own routes sorted by cost in one flat array
+    m, n = costs.shape
+    rows, columns, values = route_lists(costs)
+    amounts = np.zeros(costs.nnz, dtype=np.result_type(supplies, demands))
+    live_rows, live_columns = supplies > 0, demands > 0
+
+    row_order = np.lexsort((columns, values, rows))
+    column_order = np.lexsort((rows, values, columns))
+    row_end = costs.indptr[1:]
+    column_end = np.cumsum(np.bincount(columns, minlength=n))
+    row_first, row_second = costs.indptr[:-1].copy(), costs.indptr[:-1].copy()
+    column_first = column_end - np.bincount(columns, minlength=n)
+    column_second = column_first.copy()
+
+    rows_values, column_values = np.full(m, -np.inf), np.full(n, -np.inf)
+    update_route_penalties(values, row_order, columns, row_end, row_first, row_second, live_columns, rows_values,
+                           np.flatnonzero(live_rows))
+    update_route_penalties(values, column_order, rows, column_end, column_first, column_second, live_rows,
+                           column_values, np.flatnonzero(live_columns))
+
+    iteration, answer = 0, 0
+    while True:
+        row, column = np.argmax(rows_values), np.argmax(column_values)
+        max_row_value, max_column_value = rows_values[row], column_values[column]
+        if max(max_row_value, max_column_value) == -np.inf:
+            break
+        iteration += 1
 
         if max_row_value >= max_column_value:
-            row = rows_values.index(max_row_value)
-            valid_columns = np.where(table.demands > 0)[0]
-            column = valid_columns[np.argmin(table.costs[row, valid_columns])]
+            route = row_order[row_first[row]]
+        else:
+            route = column_order[column_first[column]]
+        row, column = rows[route], columns[route]
+
+        replacement = min(supplies[row], demands[column])
+        amounts[route] += replacement
+        supplies[row] -= replacement
+        demands[column] -= replacement
+        if observer:
+            answer += replacement * values[route]
+            observer({'iteration': iteration, 'pivot_row': row, 'pivot_col': column, 'step': replacement,
+                      'objective': answer})
+
+        if supplies[row] == 0:
+            live_rows[row] = False
+            rows_values[row] = -np.inf
+            update_route_penalties(values, column_order, rows, column_end, column_first, column_second, live_rows,
+                                   column_values,
+                                   route_pointing_at(row, column_order, rows, column_end, column_first,
+                                                     column_second, live_columns))
+        if demands[column] == 0:
+            live_columns[column] = False
+            column_values[column] = -np.inf
+            update_route_penalties(values, row_order, columns, row_end, row_first, row_second, live_columns,
+                                   rows_values,
+                                   route_pointing_at(column, row_order, columns, row_end, row_first, row_second,
+                                                     live_rows))
+
+    return amounts, iteration
+
+
+def route_russell(costs: sparse.csr_matrix, supplies: np.ndarray, demands: np.ndarray, observer=None) -> tuple:
+    # Russell's method as in russel_approximation_method, over the live
+    # routes only
+    m, n = costs.shape
+    rows, columns, values = route_lists(costs)
+    amounts = np.zeros(costs.nnz, dtype=np.result_type(supplies, demands))
+    live_rows, live_columns = supplies > 0, demands > 0
+
+    # Live routes grouped by row (CSR order) and by column, compacted as
+    # rows and columns are deleted
+    live, by_column = np.arange(costs.nnz), np.lexsort((rows, columns))
+    live_sources, live_destinations, live_values = rows, columns, values
+    column_values, column_groups = values[by_column], columns[by_column]
+
+    iteration, answer = 0, 0
+    while True:
+        keep = live_rows[live_sources] & live_columns[live_destinations]
+        live, live_sources, live_destinations, live_values = \
+            live[keep], live_sources[keep], live_destinations[keep], live_values[keep]
+        keep = live_rows[rows[by_column]] & live_columns[column_groups]
+        by_column, column_values, column_groups = by_column[keep], column_values[keep], column_groups[keep]
+        if live.size == 0:
+            break
+
+        max_row_values = grouped_max(live_values, live_sources, m)
+        max_column_values = grouped_max(column_values, column_groups, n)
+        temp_table = live_values - max_row_values[live_sources] - max_column_values[live_destinations]
+
+        for route in live[temp_table == np.min(temp_table)]:
+            row, column = rows[route], columns[route]
+            replacement = min(supplies[row], demands[column])
+            amounts[route] += replacement
+            supplies[row] -= replacement
+            demands[column] -= replacement
+            iteration += 1
+            if observer:
+                answer += replacement * values[route]
+                observer({'iteration': iteration, 'pivot_row': row, 'pivot_col': column, 'step': replacement,
+                          'objective': answer})
+
+            if supplies[row] == 0:
+                live_rows[row] = False
+            if demands[column] == 0:
+                live_columns[column] = False
+
+    return amounts, iteration
+
+
+def route_lists(costs: sparse.csr_matrix) -> tuple:
+    # Source, destination and cost of every route, in CSR order
+    rows = np.repeat(np.arange(costs.shape[0]), np.diff(costs.indptr))
+    return rows, costs.indices, costs.data
+
+
+def grouped_max(values: np.ndarray, groups: np.ndarray, size: int) -> np.ndarray:
+    # Maximum of the values of every group, for values sorted by group;
+    # -inf for groups without values
+    starts = np.searchsorted(groups, np.arange(size))
+    present = np.diff(starts, append=values.size) > 0
+    maxima = np.full(size, -np.inf)
+    maxima[present] = np.maximum.reduceat(values, starts[present])
+    return maxima
+
+
+def route_plan(table: TransportationTable, costs: sparse.csr_matrix, amounts: np.ndarray) -> tuple:
+    # Allocation in the table's own shape and format (the dummy line
+    # dropped) with its cost
+    m, n = table.sources_number, table.destinations_number
+    plan = sparse.csr_matrix((amounts, costs.indices, costs.indptr), shape=costs.shape)[:m, :n]
+    plan.eliminate_zeros()
+    return (plan if table.is_sparse else plan.toarray()), np.dot(amounts, costs.data)
+
+
+def update_route_penalties(values: np.ndarray, order: np.ndarray, endpoints: np.ndarray, end: np.ndarray,
+                           first: np.ndarray, second: np.ndarray, live: np.ndarray, penalties: np.ndarray,
+                           lines: np.ndarray):
+    # update_penalties over flat, per-line sorted route lists; first and
+    # second are absolute positions in order, a line without live routes
+    # gets penalty -inf
+    first[lines] = skip_deleted_routes(order, endpoints, end, first[lines], live, lines)
+    second[lines] = skip_deleted_routes(order, endpoints, end, np.maximum(second[lines], first[lines] + 1), live,
+                                        lines)
+
+    penalties[lines] = np.where(first[lines] < end[lines], 0, -np.inf)
+    two = lines[second[lines] < end[lines]]
+    penalties[two] = values[order[second[two]]] - values[order[first[two]]]
+
+
+def skip_deleted_routes(order: np.ndarray, endpoints: np.ndarray, end: np.ndarray, positions: np.ndarray,
+                        live: np.ndarray, lines: np.ndarray) -> np.ndarray:
+    positions = positions.copy()
+    pending = np.arange(lines.size)
+    while pending.size:
+        at = positions[pending]
+        inside = at < end[lines[pending]]
+        deleted = np.zeros(pending.size, dtype=bool)
+        deleted[inside] = ~live[endpoints[order[at[inside]]]]
+        pending = pending[deleted]
+        positions[pending] += 1
+
+    return positions
+
+
+def route_pointing_at(index: int, order: np.ndarray, endpoints: np.ndarray, end: np.ndarray, first: np.ndarray,
+                      second: np.ndarray, live: np.ndarray) -> np.ndarray:
+    lines = np.flatnonzero(live)
+    hits = np.zeros(lines.size, dtype=bool)
+    for positions in (first[lines], second[lines]):
+        inside = positions < end[lines]
+        hits[inside] |= endpoints[order[positions[inside]]] == index
+    return lines[hits]
+
+
+def transportation_simplex(costs: np.ndarray, supplies: np.ndarray, demands: np.ndarray,
+                           allocation: np.ndarray, observer=None, max_iterations=None) -> Plan:
+    # Optimal plan of a dense balanced table from a basic feasible allocation
+    m, n = costs.shape
+
+    # Positive cells first, then zero cells, cheapest first
+    order = np.argsort(np.where(allocation > 0, -np.inf, costs), axis=None, kind='stable')
+    basis, _ = spanning_tree_basis(m, n, order // n, order % n)
+    basis = [divmod(order[k].item(), n) for k in basis]
+    flows = {cell: allocation[cell].item() for cell in basis}
+
+    # Blocks of whole rows, about sqrt(m n) cells each
+    size = max(1, min(m, round(np.sqrt(m * n) / n)))
+    reduced = np.empty((size, n))
+
+    def price_block(k, u, v):
+        # Most negative reduced cost c_ij - u_i - v_j in the k-th block
+        rows = slice(k * size, min(m, (k + 1) * size))
+        block = reduced[:rows.stop - rows.start]
+        np.subtract(costs[rows], u[rows, None], out=block)
+        np.subtract(block, v[None, :], out=block)
+        row, column = divmod(np.argmin(block).item(), n)
+        return rows.start + row, column, costs[rows.start + row, column].item(), block[row, column].item()
+
+    price = block_pricing(-(-m // size), price_block)
+    status, iterations = network_simplex(m, n, [(i, j, costs[i, j].item()) for i, j in basis], flows, price,
+                                         observer, max_iterations)
+    if status != 'optimal':
+        return Plan(status=status, iterations=iterations)
+
+    allocation = np.zeros((m, n), dtype=np.result_type(supplies, demands))
+    for cell, amount in flows.items():
+        allocation[cell] = amount
+    return Plan(allocation, np.sum(allocation * costs), iterations=iterations)
+
+
+def route_transportation_simplex(costs: sparse.csr_matrix, supplies: np.ndarray, demands: np.ndarray,
+                                 amounts: np.ndarray, observer=None, max_iterations=None) -> Plan:
+    # Optimal amounts on the routes of a balanced CSR table (in CSR order)
+    # with their cost, from start amounts that need not place all capacity.
+    # What is left over and parts of the network the routes leave
+    # disconnected go on artificial cells at a big-M cost; the plan is
+    # 'infeasible' if flow is left on them at the optimum
+    m, n = costs.shape
+    rows, columns, values = route_lists(costs)
+    keys = rows.astype(np.int64) * n + columns
+    big_m = (m + n) * (np.max(np.abs(values), initial=0) + 1)
+
+    # Leftovers paired in north-west corner order go on a route where there
+    # is one and on an artificial cell otherwise
+    amounts = amounts.copy()
+    left_supplies = supplies - np.bincount(rows, amounts, minlength=m).astype(supplies.dtype)
+    left_demands = demands - np.bincount(columns, amounts, minlength=n).astype(demands.dtype)
+    artificial = {}
+    for i, j, amount in north_west_corner_cells(left_supplies, left_demands):
+        route = np.searchsorted(keys, i * n + j)
+        if route < keys.size and keys[route] == i * n + j:
+            amounts[route] += amount
         else:
-            column = column_values.index(max_column_value)
-            valid_rows = np.where(table.supplies > 0)[0]
-            row = valid_rows[np.argmin(table.costs[valid_rows, column])]
-
-        replacement = min(table.supplies[row], table.demands[column])
-        answer += replacement * table.costs[row, column]
-        table.supplies[row] -= replacement
-        table.demands[column] -= replacement
-
-        if table.supplies[row] == 0:
-            table.costs[row, :] = 1e9
-        if table.demands[column] == 0:
-            table.costs[:, column] = 1e9
-
-        if len(np.where(table.supplies > 0)[0]) == 1 and len(np.where(table.demands > 0)[0]) == 1:
-            supply_index = np.where(table.supplies > 0)[0][0]
-            demand_index = np.where(table.demands > 0)[0][0]
-            if table.supplies[supply_index] == table.demands[demand_index]:
-                answer += table.supplies[supply_index] * \
-                    table.costs[supply_index, demand_index]
+            artificial[i, j] = amount
+
+    edge_rows = np.append(rows, [i for i, _ in artificial]).astype(int)
+    edge_columns = np.append(columns, [j for _, j in artificial]).astype(int)
+    edge_costs = np.append(values, np.full(len(artificial), big_m))
+    edge_amounts = np.append(amounts, list(artificial.values()))
+
+    order = np.argsort(np.where(edge_amounts > 0, -np.inf, edge_costs), kind='stable')
+    basis, component = spanning_tree_basis(m, n, edge_rows[order], edge_columns[order])
+    flows = {(edge_rows[order[k]].item(), edge_columns[order[k]].item()): edge_amounts[order[k]].item()
+             for k in basis}
+    connections = connecting_cells(m, n, component)
+    for cell in connections:
+        flows[cell] = artificial[cell] = 0
+    if connections:
+        edge_rows = np.append(edge_rows, [i for i, _ in connections])
+        edge_columns = np.append(edge_columns, [j for _, j in connections])
+        edge_costs = np.append(edge_costs, np.full(len(connections), big_m))
+    cost_of = dict(zip(zip(edge_rows.tolist(), edge_columns.tolist()), edge_costs.tolist()))
+
+    # Blocks of about sqrt(edges) routes and artificial cells each
+    size = max(1, round(np.sqrt(edge_costs.size)))
+
+    def price_block(k, u, v):
+        # Most negative reduced cost in the k-th block
+        edges = slice(k * size, (k + 1) * size)
+        reduced = edge_costs[edges] - u[edge_rows[edges]] - v[edge_columns[edges]]
+        e = k * size + np.argmin(reduced).item()
+        return edge_rows[e].item(), edge_columns[e].item(), edge_costs[e].item(), reduced[e - k * size].item()
+
+    price = block_pricing(-(-edge_costs.size // size), price_block)
+    status, iterations = network_simplex(m, n, [(i, j, cost_of[i, j]) for i, j in flows], flows, price, observer,
+                                         max_iterations)
+    if status != 'optimal':
+        return Plan(status=status, iterations=iterations)
+    if any(flows.get(cell, 0) > 0 for cell in artificial):
+        return Plan(status='infeasible', iterations=iterations)
+    amounts = np.zeros(costs.nnz, dtype=np.result_type(supplies, demands))
+    for (i, j), amount in flows.items():
+        if (i, j) not in artificial:
+            amounts[np.searchsorted(keys, i * n + j)] = amount
+    return Plan(amounts, np.dot(amounts, values), iterations=iterations)
+
+
+def block_pricing(blocks: int, price_block):
+    # Partial pricing: price_block(k, u, v) gives the cell with the most
+    # negative reduced cost in the k-th block as (row, column, cost, reduced
+    # cost). The blocks are scanned round-robin from the one the last
+    # entering cell came from, stopping at the first with a negative
+    # reduced cost, so only the last pivot prices every cell
+    last = [0]
+
+    def price(u, v):
+        for step in range(blocks):
+            k = (last[0] + step) % blocks
+            cell = price_block(k, u, v)
+            if cell[3] < -1e-9:
+                last[0] = k
+                break
+        return cell
+
+    return price
+
+
+def network_simplex(m: int, n: int, basis: list, flows: dict, price, observer=None, max_iterations=None) -> tuple:
+    # u-v (MODI) method on a spanning-tree basis. Nodes 0..m-1 are sources,
+    # m..m+n-1 destinations and every basic cell (i, j, cost) is a tree
+    # edge; flows holds their amounts and is updated in place. price(u, v)
+    # returns an entering cell with a negative reduced cost c_ij - u_i - v_j
+    # if there is one, as (row, column, cost, reduced cost). An observer
+    # gets a record of every pivot with the time spent pricing, on the
+    # cycle and re-rooting.
+    # Returns the status, 'optimal' or 'iteration limit' after
+    # max_iterations pivots (100 (m + n) by default, far more than a solve
+    # takes), with the number of pivots.
+    if max_iterations is None:
+        max_iterations = 100 * (m + n)
+
+    # The tree is kept as parent links and a preorder of its nodes, in
+    # which the subtree of a node is the slice from its position over its
+    # size; a pivot moves one subtree and shifts its potentials as slices
+    parent, order, potential = tree_arrays(m, n, basis)
+    position, size = np.empty(m + n, dtype=int), np.ones(m + n, dtype=int)
+    position[order] = np.arange(m + n)
+    for node in order[:0:-1].tolist():
+        size[parent[node]] += size[node]
+    sign = np.concatenate([np.ones(m), -np.ones(n)])
+
+    if observer:
+        # A pivot moving theta units changes the cost by theta times the
+        # reduced cost, so the objective is only summed once
+        costs = {(i, j): cost for i, j, cost in basis}
+        objective = sum(amount * costs[cell] for cell, amount in flows.items())
+    iteration = 0
+    while True:
+        if observer:
+            began = time.perf_counter()
+        row, column, cost, reduced = price(potential[:m], potential[m:])
+        if reduced >= -1e-9:
+            return 'optimal', iteration
+        if iteration == max_iterations:
+            return 'iteration limit', iteration
+        iteration += 1
+        if observer:
+            priced = time.perf_counter()
+
+        # The entering cell closes a cycle with the tree path between its
+        # source and destination; cells alternate between + and -
+        cycle = tree_path(row, m + column, parent, position, size)
+        cells = [(a, b - m) if a < m else (b, a - m) for a, b in zip(cycle, cycle[1:])]
+        decreasing = cells[0::2]
+
+        theta_index = min(range(len(decreasing)), key=lambda k: flows[decreasing[k]])
+        theta = flows[decreasing[theta_index]]
+        for k, cell in enumerate(cells):
+            flows[cell] += theta if k % 2 else -theta
+        flows[row, column] = theta
+        if observer:
+            cycled = time.perf_counter()
+
+        # Dropping the leaving edge cuts off the subtree below it; the
+        # entering edge hangs it back on, re-rooted at its end inside
+        i, j = decreasing[theta_index]
+        del flows[i, j]
+        cut = m + j if parent[m + j] == i else i
+        first, count = position[cut].item(), size[cut].item()
+        start, end = (row, m + column) if first <= position[row] < first + count else (m + column, row)
+        path = [start]
+        while path[-1] != cut:
+            path.append(parent[path[-1]])
+
+        # The re-rooted subtree in preorder: the one of start, then each
+        # node up the path with the rest of its old subtree
+        pieces = [order[position[start]:position[start] + size[start]]]
+        for below, node in zip(path, path[1:]):
+            pieces.append(order[position[node]:position[below]])
+            pieces.append(order[position[below] + size[below]:position[node] + size[node]])
+        subtree = np.concatenate(pieces)
+
+        # Sizes: the old ancestors of cut lose the subtree and end and its
+        # ancestors gain it; up the path each node keeps the rest of its old
+        # subtree and gains the node above
+        at = position[end].item()
+        losing, gaining = (position < first) & (position + size > first), (position <= at) & (position + size > at)
+        size[losing] -= count
+        size[gaining] += count
+        above = 0
+        for below, node in zip(path[-2::-1], path[:0:-1]):
+            above = size[node] - size[below] + above
+            size[node] = above
+        size[start] = count
+
+        for below, node in zip(path, path[1:]):
+            parent[node] = below
+        parent[start] = end
+
+        # The subtree goes in right after end, as its first child
+        if at < first:
+            order = np.concatenate([order[:at + 1], subtree, order[at + 1:first], order[first + count:]])
+        else:
+            order = np.concatenate([order[:first], order[first + count:at + 1], subtree, order[at + 1:]])
+        position[order] = np.arange(m + n)
+
+        # u_i + v_j = c_ij on the entering cell; potentials of the subtree
+        # shift together, those of sources against those of destinations
+        shift = (cost - potential[end] - potential[start]) * sign[start]
+        potential[subtree] += shift * sign[subtree]
+
+        if observer:
+            objective += theta * reduced
+            observer({'iteration': iteration, 'objective': objective, 'step': theta, 'pivot_row': row,
+                      'pivot_col': column, 'dual_residual': -reduced,
+                      'times': {'pricing': priced - began, 'ratio test': cycled - priced,
+                                'tree update': time.perf_counter() - cycled}})
+
+
+def spanning_tree_basis(m: int, n: int, rows: np.ndarray, columns: np.ndarray) -> tuple:
+    # Indexes of the candidate cells, taken in order, that join sources and
+    # destinations into a forest without closing a cycle (a tree of
+    # m + n - 1 cells when they can), and the component of every node
+    root = list(range(m + n))
+
+    def find(node):
+        while root[node] != node:
+            root[node] = root[root[node]]
+            node = root[node]
+        return node
+
+    basis = []
+    for k, (i, j) in enumerate(zip(rows.tolist(), columns.tolist())):
+        a, b = find(i), find(m + j)
+        if a != b:
+            root[a] = b
+            basis.append(k)
+            if len(basis) == m + n - 1:
                 break
 
-    return answer
+    return basis, [find(node) for node in range(m + n)]
+
+
+def connecting_cells(m: int, n: int, component: list) -> list:
+    # Cells joining every component of a forest to the one of source 0: a
+    # component with a destination hangs on source 0, a lone source on a
+    # destination already joined
+    joined = {component[0]}
+    destination = next((j for j in range(n) if component[m + j] == component[0]), None)
+    cells = []
+    for j in range(n):
+        if component[m + j] not in joined:
+            joined.add(component[m + j])
+            cells.append((0, j))
+            destination = j if destination is None else destination
+    for i in range(m):
+        if component[i] not in joined:
+            joined.add(component[i])
+            cells.append((i, destination))
+
+    return cells
+
+
+def north_west_corner_cells(supplies: np.ndarray, demands: np.ndarray) -> list:
+    # (row, column, amount) cells pairing the positive capacities in
+    # north-west corner order
+    cells = []
+    rows, columns = np.flatnonzero(supplies > 0).tolist(), np.flatnonzero(demands > 0).tolist()
+    supplies, demands = supplies.copy(), demands.copy()
+    i, j = 0, 0
+    while i < len(rows) and j < len(columns):
+        row, column = rows[i], columns[j]
+        replacement = min(supplies[row], demands[column])
+        cells.append((row, column, replacement))
+        supplies[row] -= replacement
+        demands[column] -= replacement
+        if supplies[row] == 0:
+            i += 1
+        else:
+            j += 1
 
+    return cells
 
-def russel_approximation_method(table: TransportationTable) -> int:
-    if not is_balanced(table):
-        print("The method is not applicable!")
-        return None
 
-    answer = 0
+def tree_arrays(m: int, n: int, basis: list) -> tuple:
+    # Parent links, a depth-first preorder and potentials u_i + v_j = c_ij
+    # of the tree of basic cells, rooted at source 0 with u_0 = 0
+    neighbours = [[] for _ in range(m + n)]
+    for i, j, cost in basis:
+        neighbours[i].append((m + j, cost))
+        neighbours[m + j].append((i, cost))
 
-    temp_table = np.copy(table.costs)
-
-    while np.any(table.demands > 0) and np.any(table.supplies > 0):
-        valid_row_indexes = np.where(table.supplies > 0)[0]
-        valid_column_indexes = np.where(table.demands > 0)[0]
-
-        for i in valid_row_indexes:
-            for j in valid_column_indexes:
-                if table.costs[i][j] != 1e9:
-                    max_column_value = np.max(
-                        table.costs[table.costs[:, j] != 1e9, j])
-                    max_row_value = np.max(
-                        table.costs[i, table.costs[i, :] != 1e9])
-                    temp_table[i][j] = table.costs[i, j] - \
-                        max_column_value - max_row_value
-
-        max_negative_value = 1e9
-        for i in valid_row_indexes:
-            for j in valid_column_indexes:
-                if table.costs[i][j] != 1e9:
-                    max_negative_value = min(
-                        max_negative_value, temp_table[i, j])
-
-        min_negative_indexes = []
-        for i in valid_row_indexes:
-            for j in valid_column_indexes:
-                if table.costs[i][j] != 1e9 and max_negative_value == temp_table[i][j]:
-                    min_negative_indexes.append((i, j))
-
-        for pair in min_negative_indexes:
-            row, column = pair
-            replacement = min(table.supplies[row], table.demands[column])
-            answer += replacement * table.costs[row, column]
-
-            table.supplies[row] -= replacement
-            table.demands[column] -= replacement
-
-            if table.supplies[row] == 0:
-                table.costs[row, :] = 1e9
-                temp_table[row, :] = 1e9
-
-            if table.demands[column] == 0:
-                table.costs[:, column] = 1e9
-                temp_table[:, column] = 1e9
-
-        if len(np.where(table.supplies > 0)[0]) == 1 and len(np.where(table.demands > 0)[0]) == 1:
-            supply_index = np.where(table.supplies > 0)[0][0]
-            demand_index = np.where(table.demands > 0)[0][0]
-            if table.supplies[supply_index] == table.demands[demand_index]:
-                answer += table.supplies[supply_index] * \
-                    table.costs[supply_index, demand_index]
-                break
+    parent, potential, order = [-1] * (m + n), [0.0] * (m + n), []
+    stack = [0]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        for other, cost in neighbours[node]:
+            if other != parent[node]:
+                parent[other] = node
+                potential[other] = cost - potential[node]
+                stack.append(other)
+
+    return parent, np.array(order), np.array(potential)
+
+
+def tree_path(start: int, end: int, parent: list, position: np.ndarray, size: np.ndarray) -> list:
+    # Path between two tree nodes through their lowest common ancestor, the
+    # first node up from start whose preorder slice holds end
+    head, tail = [start], [end]
+    while not position[head[-1]] <= position[end] < position[head[-1]] + size[head[-1]]:
+        head.append(parent[head[-1]])
+    while tail[-1] != head[-1]:
+        tail.append(parent[tail[-1]])
+
+    return head + tail[-2::-1]
+
+
+def optimal_transportation(table: TransportationTable, method=vogel_approximation_method, observer=None,
+                           max_iterations=None) -> Plan:
+    # Optimal plan warm-started from one of the approximation methods. The
+    # observer follows the pivots of the u-v method, whose number is the
+    # plan's iterations.
+    if not table.is_sparse and is_balanced(table):
+        method(table)
+        return transportation_simplex(table.costs, table.supplies, table.demands, table.allocation, observer,
+                                      max_iterations)
+
+    # On routes the plan continues from wherever the method got, even when
+    # it could not place everything
+    costs, supplies, demands = table.routes()
+    amounts, _ = route_methods[method](costs, supplies.copy(), demands.copy())
+    plan = route_transportation_simplex(costs, supplies, demands, amounts, observer, max_iterations)
+    if not plan:
+        return plan
+    return Plan(*route_plan(table, costs, plan[0]), iterations=plan.iterations)
 
-    return answer
+
+route_methods = {
+    north_west_corner_method: route_north_west_corner,
+    vogel_approximation_method: route_vogel,
+    russel_approximation_method: route_russell,
+}
+
+
+def report(name, plan):
+    # The cost of a plan, or what went wrong
+    print(f"{name}:", plan[1] if plan else plan.message)
 
 
 def main():
+    methods = [("Northwest Corner Method", north_west_corner_method),
+               ("Vogel's Approximation Method", vogel_approximation_method),
+               ("Russell's Approximation Method", russel_approximation_method)]
+
     # First table
     first_table = TransportationTable(3, 4)
     first_table.supplies = np.array([160, 140, 170])
@@ -224,80 +945,72 @@ def main():
     print("-------------------------")
     first_table.print_table()
     print("\n-------------------------")
-    print("Northwest Corner Method:", north_west_corner_method(first_table))
-
-    # Second table
-    second_table = TransportationTable(3, 4)
-    second_table.supplies = np.array([160, 140, 170])
-    second_table.demands = np.array([120, 50, 190, 110])
-
-    second_table.costs = np.array([[7, 8, 1, 2],
-                                   [4, 5, 9, 8],
-                                   [9, 2, 3, 6]])
-
-    print("\nSecond table")
-    print("-------------------------")
-    second_table.print_table()
-    print("\n-------------------------")
-    print("Vogel's Approximation Method:",
-          vogel_approximation_method(second_table))
-
-    # Third table
-    third_table = TransportationTable(3, 4)
-    third_table.supplies = np.array([160, 140, 170])
-    third_table.demands = np.array([120, 50, 190, 110])
-
-    third_table.costs = np.array([[7, 8, 1, 2],
-                                  [4, 5, 9, 8],
-                                  [9, 2, 3, 6]])
-
-    print("\nThird table")
-    print("-------------------------")
-    third_table.print_table()
-    print("\n-------------------------")
-    print("Russell's Approximation Method:",
-          russel_approximation_method(third_table))
+    for name, method in methods:
+        report(name, method(first_table))
 
     # Unbalanced case
     unbalanced_table = TransportationTable(3, 4)
     unbalanced_table.supplies = np.array([160, 140, 170])
     unbalanced_table.demands = np.array([120, 50, 190, 150])  # Sum doesn't match supplies
 
-    print("\nUnbalanced table")
+    print("\nUnbalanced table (balanced with a dummy source)")
     print("-------------------------")
     unbalanced_table.print_table()
     print("\n-------------------------")
-    if not north_west_corner_method(unbalanced_table) and \
-        not vogel_approximation_method(unbalanced_table) and \
-        not russel_approximation_method(unbalanced_table): print("Problem is not balanced!")
+    for name, method in methods:
+        report(name, method(unbalanced_table))
 
-    fourth_table = TransportationTable(3, 4)
-    fourth_table.supplies = np.array([120, 100, 130])  # Balanced total supply
-    fourth_table.demands = np.array([90, 60, 110, 90])  # Balanced total demand
+    # Second table
+    second_table = TransportationTable(3, 4)
+    second_table.supplies = np.array([120, 100, 130])  # Balanced total supply
+    second_table.demands = np.array([90, 60, 110, 90])  # Balanced total demand
 
-    fourth_table.costs = np.array([[3, 7, 9, 4],
+    second_table.costs = np.array([[3, 7, 9, 4],
                                    [8, 5, 6, 2],
                                    [4, 3, 5, 7]])
 
-    print("\nFourth table")
+    print("\nSecond table")
+    print("-------------------------")
+    second_table.print_table()
+    print("\n-------------------------")
+    for name, method in methods:
+        report(name, method(second_table))
+
+    # Optimal plans, improved from the initial solutions by the u-v method
+    for number, table in [("First", first_table), ("Second", second_table)]:
+        print(f"\nOptimal plan for the {number.lower()} table")
+        print("-------------------------")
+        for name, method in methods:
+            plan = optimal_transportation(table, method)
+            report(f"From {name}", plan)
+        print(plan[0])
+
+    # Only some routes allowed
+    routes_table = TransportationTable.from_routes(
+        supplies=[160, 140, 170], demands=[120, 50, 190, 110],
+        sources=[0, 0, 0, 1, 1, 1, 2, 2, 2], destinations=[1, 2, 3, 0, 2, 3, 1, 2, 3],
+        costs=[8, 1, 2, 4, 9, 8, 2, 3, 6])
+
+    print("\nRoutes table")
     print("-------------------------")
-    fourth_table.print_table()
+    routes_table.print_table()
     print("\n-------------------------")
-    print("Northwest Corner Method:", north_west_corner_method(fourth_table))
-    fourth_table.supplies = np.array([120, 100, 130])  # Balanced total supply
-    fourth_table.demands = np.array([90, 60, 110, 90])  # Balanced total demand
+    for name, method in methods:
+        report(name, method(routes_table))
+    plan = optimal_transportation(routes_table)
+    report("Optimal plan", plan)
+    print(plan[0].toarray())
 
-    fourth_table.costs = np.array([[3, 7, 9, 4],
-                                   [8, 5, 6, 2],
-                                   [4, 3, 5, 7]])
-    print("Vogel's Approximation Method:", vogel_approximation_method(fourth_table))
-    third_table.supplies = np.array([120, 100, 130])  # Balanced total supply
-    third_table.demands = np.array([90, 60, 110, 90])  # Balanced total demand
+    # Random table of any size
+    random_table = TransportationTable(5, 7)
 
-    fourth_table.costs = np.array([[3, 7, 9, 4],
-                                   [8, 5, 6, 2],
-                                   [4, 3, 5, 7]])
-    print("Russell's Approximation Method:", russel_approximation_method(fourth_table))
+    print("\nRandom table")
+    print("-------------------------")
+    random_table.print_table()
+    print("\n-------------------------")
+    for name, method in methods:
+        report(name, method(random_table))
+    report("Optimal plan", optimal_transportation(random_table))
 
 if __name__ == '__main__':
     main()
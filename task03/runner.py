@@ -0,0 +1,158 @@
+import os
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from scipy import sparse
+
+from main import (Plan, TransportationTable, north_west_corner_method, vogel_approximation_method,
+                  russel_approximation_method)
+
+initial_methods = {
+    'north_west_corner': north_west_corner_method,
+    'vogel': vogel_approximation_method,
+    'russell': russel_approximation_method,
+}
+
+
+def run_methods(tables, methods=None, processes=None, in_flight=None):
+    # Runs every method on every table of a (possibly endless) stream over a
+    # process pool. The cost arrays of a table go into one shared memory
+    # block that all its method runs read, so only capacities and names are
+    # pickled. At most in_flight tables are pending at a time and results
+    # come back in input order as
+    #   {'best': name, 'methods': {name: {'status', 'cost', 'allocation', 'time'}}}
+    # with 'best' the method with the cheapest starting plan (None if every
+    # method failed), 'status' the status of the method's Plan and 'time'
+    # the wall time of the method in its worker.
+    methods = initial_methods if methods is None else methods
+    processes = processes or os.cpu_count()
+    in_flight = in_flight or 2 * processes
+
+    pending = deque()
+    with ProcessPoolExecutor(processes) as pool:
+        try:
+            for table in tables:
+                pending.append(submit_table(pool, table, methods))
+                if len(pending) >= in_flight:
+                    yield collect(*pending.popleft())
+            while pending:
+                yield collect(*pending.popleft())
+        finally:
+            # A consumer that stops early leaves blocks behind
+            for block, futures in pending:
+                for future in futures.values():
+                    future.cancel()
+                release(block, futures)
+
+
+def best_initial_solution(results) -> str:
+    # Name of the method with the cheapest plan, None if all failed
+    costs = {name: result['cost'] for name, result in results.items() if result['cost'] is not None}
+    return min(costs, key=costs.get) if costs else None
+
+
+def submit_table(pool, table, methods) -> tuple:
+    if table.is_sparse:
+        arrays = [table.costs.data, table.costs.indices, table.costs.indptr]
+    else:
+        arrays = [table.costs]
+    block, layout = share(arrays)
+    shape = table.costs.shape
+    futures = {name: pool.submit(run_shared, method, block.name, layout, shape, table.is_sparse,
+                                 table.supplies, table.demands)
+               for name, method in methods.items()}
+    return block, futures
+
+
+def collect(block, futures) -> dict:
+    results = {}
+    for name, future in futures.items():
+        plan, elapsed = future.result()
+        results[name] = {'status': plan.status, 'cost': plan[1], 'allocation': plan[0], 'time': elapsed}
+    release(block, futures)
+    return {'best': best_initial_solution(results), 'methods': results}
+
+
+def release(block, futures):
+    # Unlink a table's block once none of its runs can still attach to it
+    for future in futures.values():
+        if not future.cancelled():
+            future.exception()
+    block.close()
+    block.unlink()
+
+
+def run_shared(method, name, layout, shape, is_sparse, supplies, demands) -> tuple:
+    # Worker side: a table over read-only views of the shared block
+    block, arrays = attach(name, layout)
+    costs = table = None
+    try:
+        costs = sparse.csr_matrix(tuple(arrays), shape=shape) if is_sparse else arrays[0]
+        table = TransportationTable.from_arrays(costs, supplies, demands)
+
+        start = time.perf_counter()
+        plan = method(table)
+        elapsed = time.perf_counter() - start
+
+        # The plan must not keep views of the block alive
+        allocation = None if plan[0] is None else plan[0].copy()
+        plan = Plan(allocation, plan[1], plan.status, plan.iterations)
+    except BaseException as error:
+        # The failed frames below hold the table until the traceback goes
+        traceback.clear_frames(error.__traceback__)
+        raise
+    finally:
+        # Views left alive make close() raise BufferError over any error
+        del table, costs, arrays
+        block.close()
+    return plan, elapsed
+
+
+# Utility functions
+def share(arrays) -> tuple:
+    # Copies arrays into one new shared memory block, 8-byte aligned; the
+    # layout (shape, dtype, offset) of each is what a worker needs to attach
+    layout, offset = [], 0
+    for values in arrays:
+        layout.append((values.shape, values.dtype.str, offset))
+        offset += -(-values.nbytes // 8) * 8
+
+    block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for values, (shape, dtype, offset) in zip(arrays, layout):
+        np.ndarray(shape, dtype, buffer=block.buf, offset=offset)[...] = values
+    return block, layout
+
+
+def attach(name, layout) -> tuple:
+    # Workers share the parent's resource tracker, which unlinks the block
+    # only if the parent never does
+    block = shared_memory.SharedMemory(name=name)
+    arrays = []
+    for shape, dtype, offset in layout:
+        values = np.ndarray(shape, dtype, buffer=block.buf, offset=offset)
+        values.flags.writeable = False
+        arrays.append(values)
+    return block, arrays
+
+
+def main():
+    tables = (TransportationTable(300, 400, seed=0, instance=k) for k in range(24))
+
+    start = time.perf_counter()
+    wins = {name: 0 for name in initial_methods}
+    for k, result in enumerate(run_methods(tables)):
+        wins[result['best']] += 1
+        costs = ", ".join(f"{name} {method['cost']} ({method['time']:.3f} s)"
+                          for name, method in result['methods'].items())
+        print(f"Table {k}: {costs} -> {result['best']}")
+
+    print("Cheapest starting plan:", wins)
+    print(f"Wall time: {time.perf_counter() - start:.2f} s on {os.cpu_count()} processes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import time
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+
+from main import (TransportationTable, north_west_corner_method, optimal_transportation,
+                  russel_approximation_method, vogel_approximation_method)
+
+
+def test_observer_times():
+    # Test: phase times of every u-v pivot on a seeded 20 x 30 table
+    table = TransportationTable(20, 30, seed=0)
+    records = []
+    start = time.perf_counter()
+    allocation, cost = optimal_transportation(table, observer=records.append)
+    total = time.perf_counter() - start
+    assert records
+    assert records[-1]['objective'] == cost
+    for record in records:
+        assert all(0 <= elapsed < total for elapsed in record['times'].values())
+    assert sum(sum(record['times'].values()) for record in records) < total
+    print(
+        f"Test - pivots: {len(records)}, cost: {cost}, time: {total:.4f} s")
+
+
+def test_plan_status():
+    # Test: every method says why it has no plan. North-west corner sends
+    # source 0 to destination 0 and leaves source 1 without a route, the
+    # u-v method finds the other plan; without route (0, 1) destination 1
+    # cannot be reached at all
+    table = TransportationTable(20, 30, seed=0)
+    for method in (north_west_corner_method, vogel_approximation_method, russel_approximation_method):
+        plan = method(table)
+        assert plan.status == 'feasible' and plan[1] == (plan[0] * table.costs).sum() and plan.iterations > 0
+    plan = optimal_transportation(table)
+    assert plan.status == 'optimal' and plan.iterations > 0
+    assert optimal_transportation(table, max_iterations=1).status == 'iteration limit'
+
+    crossed = TransportationTable.from_routes([1, 1], [1, 1], [0, 0, 1], [0, 1, 0], [1, 5, 1])
+    plan = north_west_corner_method(crossed)
+    assert plan.status == 'not applicable' and not plan and plan[1] is None
+    assert crossed.allocation is None
+    plan = optimal_transportation(crossed, north_west_corner_method)
+    assert plan.status == 'optimal' and plan[1] == 6
+
+    cut_off = TransportationTable.from_routes([1, 1], [1, 1], [0, 1], [0, 0], [1, 1])
+    assert optimal_transportation(cut_off).status == 'infeasible'
+    print(
+        f"Test - statuses: feasible, optimal, not applicable, infeasible, iteration limit")
+
+
+def test_optimal_cost():
+    # Test: optimal costs of seeded balanced tables, dense and on half of
+    # the routes, against linprog
+    rng = np.random.default_rng(0)
+    statuses = []
+    for trial in range(20):
+        m, n = rng.integers(2, 40, 2)
+        supplies, demands = rng.integers(1, 50, m), rng.integers(1, 50, n)
+        supplies[0] += max(0, demands.sum() - supplies.sum())
+        demands[0] += supplies.sum() - demands.sum()
+        costs = rng.uniform(1, 100, (m, n))
+        routes = rng.random((m, n)) < (0.5 if trial % 2 else 1.0)
+        rows, columns = np.nonzero(routes)
+        if trial % 2:
+            table = TransportationTable.from_routes(supplies, demands, rows, columns, costs[routes])
+        else:
+            table = TransportationTable.from_arrays(costs, supplies, demands)
+        plan = optimal_transportation(table)
+        statuses.append(plan.status)
+
+        cells = np.arange(rows.size)
+        A_eq = sparse.vstack([sparse.csr_matrix((np.ones(rows.size), (rows, cells)), shape=(m, rows.size)),
+                              sparse.csr_matrix((np.ones(rows.size), (columns, cells)), shape=(n, rows.size))])
+        expected = linprog(costs[routes], A_eq=A_eq, b_eq=np.concatenate([supplies, demands]))
+        assert plan.status == ('optimal' if expected.status == 0 else 'infeasible'), plan.status
+        if plan:
+            assert np.isclose(plan[1], expected.fun)
+    print(
+        f"Test - optimal: {statuses.count('optimal')}, infeasible: {statuses.count('infeasible')}")
+
+def main():
+    print("Running Transportation Observer Tests:")
+    test_observer_times()
+    test_plan_status()
+    test_optimal_cost()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+from collections import OrderedDict
+
+import numpy as np
+
+# Gradient providers build df for the optimizers from f alone. f takes the
+# coordinates of a point along the last axis, so the perturbed points of
+# one gradient go to f stacked as the rows of a (k, n) array and come back
+# as k values in a single call.
+
+
+def forward_difference(f, h=1e-7):
+    # (f(x + h_i e_i) - f(x)) / h_i with h_i relative to |x_i|; f(x) is a
+    # separate call so a memoized f answers it from the line search
+    def df(x):
+        x = np.asarray(x, float)
+        steps = perturbation(x, h)
+        points = x.reshape(1, -1) + np.diag(steps)
+        values = f(points) - f(x)
+        return (values / steps).reshape(x.shape)
+
+    return df
+
+
+def central_difference(f, h=1e-5):
+    # (f(x + h_i e_i) - f(x - h_i e_i)) / 2 h_i, all 2n points in one call
+    def df(x):
+        x = np.asarray(x, float)
+        steps = perturbation(x, h)
+        shift = np.diag(steps)
+        points = np.vstack((x.reshape(1, -1) + shift, x.reshape(1, -1) - shift))
+        values = f(points)
+        return ((values[:steps.size] - values[steps.size:]) / (2 * steps)).reshape(x.shape)
+
+    return df
+
+
+def complex_step(f, h=1e-20):
+    # Im f(x + i h e_i) / h: no subtraction, so exact to rounding for any
+    # tiny h. f must be analytic and accept complex points.
+    def df(x):
+        x = np.asarray(x, float)
+        points = x.reshape(1, -1) + 1j * h * np.eye(x.size)
+        return (np.imag(f(points)) / h).reshape(x.shape)
+
+    return df
+
+
+def memoize(f, max_size=128):
+    # LRU cache of f keyed on the bytes of the point, so repeated calls at
+    # the same x (a line search point whose gradient is asked next, f(x) at
+    # the end of a run) are not recomputed. Cached arrays are read-only.
+    # hits and misses are counted on the returned function.
+    cache = OrderedDict()
+
+    def cached(x):
+        x = np.asarray(x)
+        key = (x.shape, x.dtype.str, x.tobytes())
+        if key in cache:
+            cached.hits += 1
+            cache.move_to_end(key)
+            return cache[key]
+
+        cached.misses += 1
+        value = f(x)
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+        cache[key] = value
+        if len(cache) > max_size:
+            cache.popitem(last=False)
+        return value
+
+    cached.hits, cached.misses = 0, 0
+    cached.cache = cache
+    return cached
+
+
+gradient_methods = {
+    'forward': forward_difference,
+    'central': central_difference,
+    'complex': complex_step,
+}
+
+
+def provider(f, df=None, method='central', max_size=128):
+    # Memoized f and df for the optimizers; without df the gradient comes
+    # from method over the memoized f
+    f = memoize(f, max_size)
+    if df is None:
+        df = gradient_methods[method](f)
+    return f, memoize(df, max_size)
+
+
+# Utility functions
+def perturbation(x, h):
+    # Steps scaled to the magnitude of each coordinate
+    return h * np.maximum(1.0, np.abs(x.ravel()))
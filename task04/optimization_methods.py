@@ -1,37 +1,179 @@
+import os
+import sys
+
 import numpy as np
 
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common'))
+
+import solve_result
+
+# Inverse golden ratio, the fraction of the interval kept per step
+inv_gr = (np.sqrt(5) - 1) / 2
+
+# Every method takes an optional observer, called with a record of each
+# iteration (the iteration index, the new point or how many problems are
+# still active, and the width of the interval left as the step)
+
+
+class Point(solve_result.Result):
+    # (x, f(x)) found by a scalar method with its status and number of
+    # iterations: 'converged', 'no sign change' when bisection has no
+    # bracket, or 'iteration limit' when the interval is still wider than
+    # epsilon after max_iterations steps (an epsilon below the float
+    # spacing of the bounds never gets there)
+    solved = ('converged',)
+    messages = {
+        'no sign change': "The function does not change sign in the interval!",
+        'iteration limit': "The iteration limit was reached!",
+    }
 
-def bisection(f, a, b, epsilon):
-    if f(a) * f(b) > 0:
-        print("Error: Function does not change sign in the interval.")
-        return None
+
+def bisection(f, a, b, epsilon, observer=None, max_iterations=1000):
+    f_a, f_b = f(a), f(b)
+    if f_a * f_b > 0:
+        return Point(status='no sign change')
+    iteration = 0
     while (b - a) / 2 > epsilon:
+        if iteration == max_iterations:
+            return Point(status='iteration limit', iterations=iteration)
         c = (a + b) / 2
-        if abs(f(c)) < epsilon:
-            return c
-        elif f(a) * f(c) < 0:
+        f_c = f(c)
+        iteration += 1
+        if observer:
+            observer({'iteration': iteration, 'x': c, 'residual': abs(f_c), 'step': b - a})
+        if abs(f_c) < epsilon:
+            return Point(c, f_c, iterations=iteration)
+        elif f_a * f_c < 0:
             b = c
         else:
-            a = c
+            a, f_a = c, f_c
+
+    x = (a + b) / 2
+    return Point(x, f(x), iterations=iteration)
+
 
-    return (a + b) / 2
+def bisection_batch(f, a, b, epsilon, method='bisection', max_iterations=1000, observer=None):
+    # Finds roots on independent brackets [a_i, b_i] at once. f maps an
+    # array of points to the array of values (point i belongs to problem i)
+    # and is called once per iteration; endpoint values are kept, and
+    # converged brackets stay put while the rest are updated.
+    #
+    # method='illinois' takes regula falsi steps and halves the value of an
+    # endpoint kept twice in a row, which gives superlinear convergence.
+    # Returns the roots (nan where f does not change sign) and the number
+    # of iterations each one took.
+    a, b = np.array(a, float), np.array(b, float)
+    # Scalar bounds may still give one problem per parameter of f
+    a, b, f_a, f_b = (np.array(values, float) for values in np.broadcast_arrays(a, b, f(a), f(b)))
 
+    bracketed = f_a * f_b <= 0
+
+    c = (a + b) / 2
+    found = bracketed & ((f_a == 0) | (f_b == 0))
+    c = np.where(f_a == 0, a, np.where(f_b == 0, b, c))
+    iterations = np.zeros(a.shape, int)
+    kept = np.zeros(a.shape, int)  # Endpoint replaced last: -1 for a, 1 for b
+    active = bracketed & ~found & ((b - a) / 2 > epsilon)
+
+    for iteration in range(1, max_iterations + 1):
+        if not np.any(active):
+            break
+        if method == 'illinois':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                step = (a * f_b - b * f_a) / (f_b - f_a)
+            # Fall back to the midpoint when the secant leaves the bracket
+            step = np.where((step > a) & (step < b), step, (a + b) / 2)
+        else:
+            step = (a + b) / 2
+        c = np.where(active, step, c)
+        f_c = f(c)
+        iterations += active
 
-def golden_section(f, a, b, epsilon):
-    gr = (np.sqrt(5) + 1) / 2
+        root = active & (np.abs(f_c) < epsilon)
+        left = active & ~root & (f_a * f_c < 0)
+        right = active & ~root & ~left
+
+        if method == 'illinois':
+            f_a = np.where(left & (kept == 1), f_a / 2, f_a)
+            f_b = np.where(right & (kept == -1), f_b / 2, f_b)
+        b, f_b = np.where(left, c, b), np.where(left, f_c, f_b)
+        a, f_a = np.where(right, c, a), np.where(right, f_c, f_a)
+        kept = np.where(left, 1, np.where(right, -1, kept))
+
+        found |= root
+        active &= ~root & ((b - a) / 2 > epsilon)
+        if observer:
+            observer({'iteration': iteration, 'active': np.count_nonzero(active), 'step': np.max(b - a)})
+
+    roots = np.where(found, c, (a + b) / 2)
+    return np.where(bracketed, roots, np.nan), iterations
+
+
+def golden_section(f, a, b, epsilon, observer=None, max_iterations=1000):
+    # One new evaluation per iteration: the interior point that survives a
+    # step already sits at the golden ratio of the shrunk interval
+    y_1 = b - inv_gr * (b - a)
+    y_2 = a + inv_gr * (b - a)
+    f_1, f_2 = f(y_1), f(y_2)
+    iteration = 0
     while b - a > epsilon:
-        y_1 = b - (b - a) / gr
-        y_2 = a + (b - a) / gr
-        if f(y_1) < f(y_2):
-            b = y_2
+        if iteration == max_iterations:
+            return Point(status='iteration limit', iterations=iteration)
+        if f_1 < f_2:
+            b, y_2, f_2 = y_2, y_1, f_1
+            y_1 = b - inv_gr * (b - a)
+            f_1 = f(y_1)
         else:
-            a = y_1
+            a, y_1, f_1 = y_1, y_2, f_2
+            y_2 = a + inv_gr * (b - a)
+            f_2 = f(y_2)
+        iteration += 1
+        if observer:
+            observer({'iteration': iteration, 'x': (a + b) / 2, 'objective': min(f_1, f_2), 'step': b - a})
+    x_min = (a + b) / 2
+    return Point(x_min, f(x_min), iterations=iteration)
+
+
+def golden_section_batch(f, a, b, epsilon, observer=None):
+    # Minimizes independent problems on the intervals [a_i, b_i] at once.
+    # f maps an array of points to the array of values (point i belongs to
+    # problem i) and is called once per iteration; finished intervals stay
+    # put while the rest shrink.
+    a, b = (np.array(bound, float) for bound in np.broadcast_arrays(a, b))
+    y_1 = b - inv_gr * (b - a)
+    y_2 = a + inv_gr * (b - a)
+    f_1, f_2 = f(y_1), f(y_2)
+    active = b - a > epsilon
+    iteration = 0
+    while np.any(active):
+        left = active & (f_1 < f_2)
+        right = active & ~left
+
+        # Minimum in [a, y_2]: y_1 becomes the right point
+        b = np.where(left, y_2, b)
+        y_2, f_2 = np.where(left, y_1, y_2), np.where(left, f_1, f_2)
+        # Minimum in [y_1, b]: y_2 becomes the left point
+        a = np.where(right, y_1, a)
+        y_1, f_1 = np.where(right, y_2, y_1), np.where(right, f_2, f_1)
+
+        y = np.where(left, b - inv_gr * (b - a), a + inv_gr * (b - a))
+        values = f(y)
+        y_1, f_1 = np.where(left, y, y_1), np.where(left, values, f_1)
+        y_2, f_2 = np.where(right, y, y_2), np.where(right, values, f_2)
+        active = b - a > epsilon
+        iteration += 1
+        if observer:
+            observer({'iteration': iteration, 'active': np.count_nonzero(active), 'step': np.max(b - a)})
+
     x_min = (a + b) / 2
     return x_min, f(x_min)
 
 
-def gradient_ascent(df, f, x0, alpha, N):
+def gradient_ascent(df, f, x0, alpha, N, observer=None):
     x = x0
-    for _ in range(N):
-        x = x + alpha * df(x)
+    for iteration in range(1, N + 1):
+        step = alpha * df(x)
+        x = x + step
+        if observer:
+            observer({'iteration': iteration, 'x': x, 'step': step})
     return x, f(x)
@@ -0,0 +1,247 @@
+import time
+
+import numpy as np
+from numpy.linalg import norm
+
+# Every method minimizes f (maximizes with is_max=True) over arrays x and
+# takes df(x) returning the gradient with the shape of x. Iterates live in
+# buffers allocated once and updated in place. A run stops when the norm of
+# the gradient drops below tolerance or when a step changes x by less than
+# tolerance relative to max(1, |x|). Each returns x, f(x) and the number of
+# iterations made.
+#
+# An optional observer is called with a record of every iteration: its
+# index, the length of the step, the gradient norm, f where the method
+# knows it without an extra evaluation and, for the line search methods,
+# the time spent finding the direction and in the line search.
+
+
+def gradient_descent(df, f, x0, alpha=1.0, tolerance=1e-8, max_iterations=1000, search='armijo',
+                     is_max=False, observer=None):
+    # Steepest descent. search picks the step along -g: 'armijo' backtracks
+    # from alpha until f decreases enough, 'wolfe' also asks for the
+    # curvature condition, None keeps the fixed step alpha.
+    fun, grad = objective(f, df, is_max)
+    x = np.array(x0, float)
+    x_new, d = np.empty_like(x), np.empty_like(x)
+    g, g_new = grad(x, np.empty_like(x)), np.empty_like(x)
+    fx = fun(x) if search else None
+
+    iterations = 0
+    while iterations < max_iterations and norm(g) > tolerance:
+        iterations += 1
+        if observer:
+            start = time.perf_counter()
+        np.negative(g, out=d)
+        if observer:
+            searching = time.perf_counter()
+        if search:
+            step = line_search(fun, grad, x, fx, g, d, alpha, x_new, g_new, wolfe=search == 'wolfe')
+            if step is None:
+                break
+            step, fx = step
+        else:
+            step = alpha
+            np.multiply(d, step, out=x_new)
+            x_new += x
+            grad(x_new, g_new)
+
+        x, x_new = x_new, x
+        g, g_new = g_new, g
+        if observer:
+            notify(observer, iterations, step * norm(d), g, fx, is_max, start, searching)
+        if step * norm(d) <= tolerance * max(1.0, norm(x)):
+            break
+
+    return x, f(x), iterations
+
+
+def nesterov(df, f, x0, alpha=0.01, momentum=0.9, tolerance=1e-8, max_iterations=1000, is_max=False,
+             observer=None):
+    # Gradient steps with Nesterov momentum: the gradient is taken at the
+    # point the velocity is heading to. f is only evaluated at the end.
+    _, grad = objective(f, df, is_max)
+    x = np.array(x0, float)
+    v, ahead, g = np.zeros_like(x), np.empty_like(x), np.empty_like(x)
+
+    iterations = 0
+    while iterations < max_iterations:
+        np.multiply(v, momentum, out=ahead)
+        ahead += x
+        grad(ahead, g)
+        if norm(g) <= tolerance:
+            break
+        iterations += 1
+        if observer:
+            gradient_norm = norm(g)
+
+        # v = momentum v - alpha g
+        v *= momentum
+        g *= alpha
+        v -= g
+        x += v
+        if observer:
+            observer({'iteration': iterations, 'step': norm(v), 'gradient_norm': gradient_norm})
+        if norm(v) <= tolerance * max(1.0, norm(x)):
+            break
+
+    return x, f(x), iterations
+
+
+def adam(df, f, x0, alpha=0.001, beta_1=0.9, beta_2=0.999, epsilon=1e-8, tolerance=1e-8,
+         max_iterations=10000, is_max=False, observer=None):
+    # Adam: steps along the bias-corrected running mean of the gradient,
+    # scaled per coordinate by the root of the running mean of its square.
+    # f is only evaluated at the end.
+    _, grad = objective(f, df, is_max)
+    x = np.array(x0, float)
+    m, s = np.zeros_like(x), np.zeros_like(x)
+    g, step = np.empty_like(x), np.empty_like(x)
+
+    iterations = 0
+    while iterations < max_iterations:
+        grad(x, g)
+        if norm(g) <= tolerance:
+            break
+        iterations += 1
+
+        m *= beta_1
+        np.multiply(g, 1 - beta_1, out=step)
+        m += step
+        s *= beta_2
+        np.multiply(g, g, out=step)
+        step *= 1 - beta_2
+        s += step
+
+        # step = alpha m_hat / (sqrt(s_hat) + epsilon)
+        np.sqrt(s, out=step)
+        step /= np.sqrt(1 - beta_2 ** iterations)
+        step += epsilon
+        np.divide(m, step, out=step)
+        step *= alpha / (1 - beta_1 ** iterations)
+        x -= step
+        if observer:
+            observer({'iteration': iterations, 'step': norm(step), 'gradient_norm': norm(g)})
+        if norm(step) <= tolerance * max(1.0, norm(x)):
+            break
+
+    return x, f(x), iterations
+
+
+def lbfgs(df, f, x0, memory=10, tolerance=1e-8, max_iterations=1000, is_max=False, observer=None):
+    # Limited-memory BFGS: the direction applies the inverse Hessian
+    # approximation of the last memory (s, y) pairs with the two-loop
+    # recursion, and the step satisfies the Wolfe conditions. The pairs are
+    # kept in a ring of preallocated rows.
+    fun, grad = objective(f, df, is_max)
+    x = np.array(x0, float)
+    x_new, d, scratch = np.empty_like(x), np.empty_like(x), np.empty_like(x)
+    g, g_new = grad(x, np.empty_like(x)), np.empty_like(x)
+    fx = fun(x)
+
+    S = np.zeros((memory,) + x.shape)
+    Y = np.zeros((memory,) + x.shape)
+    rho = np.zeros(memory)
+    a = np.zeros(memory)
+    head, stored = 0, 0
+
+    iterations = 0
+    while iterations < max_iterations and norm(g) > tolerance:
+        iterations += 1
+        if observer:
+            start = time.perf_counter()
+
+        # Two-loop recursion, newest pair first
+        np.negative(g, out=d)
+        order = [(head - 1 - k) % memory for k in range(stored)]
+        for i in order:
+            a[i] = rho[i] * np.vdot(S[i], d)
+            np.multiply(Y[i], a[i], out=scratch)
+            d -= scratch
+        if stored:
+            newest = order[0]
+            d *= np.vdot(S[newest], Y[newest]) / np.vdot(Y[newest], Y[newest])
+        else:
+            # No curvature yet, keep the first trial step short
+            d /= max(1.0, norm(g))
+        for i in reversed(order):
+            np.multiply(S[i], a[i] - rho[i] * np.vdot(Y[i], d), out=scratch)
+            d += scratch
+
+        if observer:
+            searching = time.perf_counter()
+        step = line_search(fun, grad, x, fx, g, d, 1.0, x_new, g_new, wolfe=True)
+        if step is None:
+            break
+        _, fx = step
+
+        np.subtract(x_new, x, out=S[head, ...])
+        np.subtract(g_new, g, out=Y[head, ...])
+        sy = np.vdot(S[head], Y[head])
+        change = norm(S[head])
+        if sy > 1e-12:
+            # Pairs without positive curvature would break the approximation
+            rho[head] = 1 / sy
+            head = (head + 1) % memory
+            stored = min(stored + 1, memory)
+
+        x, x_new = x_new, x
+        g, g_new = g_new, g
+        if observer:
+            notify(observer, iterations, change, g, fx, is_max, start, searching)
+        if change <= tolerance * max(1.0, norm(x)):
+            break
+
+    return x, f(x), iterations
+
+
+def line_search(fun, grad, x, fx, g, d, alpha, x_new, g_new, wolfe=False, c_1=1e-4, c_2=0.9,
+                max_steps=50):
+    # Finds a step along the descent direction d with sufficient decrease
+    # (Armijo) and, for wolfe, the curvature condition, by bisecting the
+    # bracket of acceptable steps. The point and its gradient are written
+    # to x_new and g_new; returns the step and f there, None if no step
+    # was found.
+    slope = np.vdot(g, d)
+    if slope >= 0:
+        return None
+
+    low, high = 0.0, np.inf
+    for _ in range(max_steps):
+        np.multiply(d, alpha, out=x_new)
+        x_new += x
+        f_new = fun(x_new)
+        if f_new > fx + c_1 * alpha * slope:
+            high = alpha
+        else:
+            grad(x_new, g_new)
+            if not wolfe or np.vdot(g_new, d) >= c_2 * slope:
+                return alpha, f_new
+            low = alpha
+        alpha = 2 * alpha if np.isinf(high) else (low + high) / 2
+    return None
+
+
+# Utility functions
+def notify(observer, iteration, step, g, fx, is_max, start, searching):
+    # Record of a line search method; fx is the minimized value
+    observer({
+        'iteration': iteration,
+        'objective': None if fx is None else -fx if is_max else fx,
+        'step': step,
+        'gradient_norm': norm(g),
+        'times': {'direction': searching - start, 'line search': time.perf_counter() - searching},
+    })
+
+
+def objective(f, df, is_max):
+    # f and df of the minimized problem; the gradient goes into a buffer
+    sign = -1.0 if is_max else 1.0
+
+    def fun(x):
+        return sign * f(x)
+
+    def grad(x, out):
+        return np.multiply(df(x), sign, out=out)
+
+    return fun, grad
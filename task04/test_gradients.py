@@ -0,0 +1,64 @@
+import gradients as gr
+import optimizers as op
+import numpy as np
+
+
+def rosenbrock(x): return np.sum(100*(x[..., 1:] - x[..., :-1]**2)**2 + (1 - x[..., :-1])**2, axis=-1)
+
+def rosenbrock_gradient(x):
+    g = np.zeros_like(x)
+    g[:-1] = -400*x[:-1]*(x[1:] - x[:-1]**2) - 2*(1 - x[:-1])
+    g[1:] += 200*(x[1:] - x[:-1]**2)
+    return g
+
+def test_finite_differences():
+    # Test: gradient of the Rosenbrock function at x = (-1, ..., 1) against
+    # the analytic one; relative errors of order h for forward, h^2 for
+    # central and rounding only for the complex step
+    x = np.linspace(-1, 1, 5)
+    exact = rosenbrock_gradient(x)
+    tolerances = {'forward': 100 * 1e-7, 'central': 100 * 1e-5**2, 'complex': 1e-12}
+    for method, gradient in gr.gradient_methods.items():
+        df = gradient(rosenbrock)
+        error = np.max(np.abs(df(x) - exact)) / np.max(np.abs(exact))
+        assert error < tolerances[method], (method, error)
+        print(
+            f"Test - {method}: {df(x)}, relative error: {error:.1e}")
+
+def test_memoize():
+    # Test: repeated points come from the cache without calling f, the
+    # least recently used point is dropped past max_size
+    calls = []
+    def f(x):
+        calls.append(x.copy())
+        return x * 2
+    cached = gr.memoize(f, max_size=2)
+    first = cached(np.array([1.0, 2.0]))
+    assert cached(np.array([1.0, 2.0])) is first and len(calls) == 1
+    assert not first.flags.writeable
+    cached(np.array([3.0]))
+    cached(np.array([4.0]))
+    cached(np.array([1.0, 2.0]))
+    assert len(calls) == 4 and (cached.hits, cached.misses) == (1, 4)
+    print(
+        f"Test - hits/misses: {cached.hits}/{cached.misses}")
+
+def test_provider():
+    # Test: L-BFGS on the Rosenbrock function with memoized central differences
+    f, df = gr.provider(rosenbrock)
+    x_min, f_min, iterations = op.lbfgs(df, f, -np.ones(5))
+    assert np.allclose(x_min, 1, atol=1e-4) and f.hits > 0
+    print(
+        f"Test - f_min: {f_min}, iterations: {iterations}, f hits/misses: {f.hits}/{f.misses}")
+
+def main():
+    print("Running Finite Difference Tests:")
+    test_finite_differences()
+    print("\nRunning Memoization Tests:")
+    test_memoize()
+    print("\nRunning Gradient Provider Tests:")
+    test_provider()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import optimization_methods as om
 import math
+import numpy as np
 
 
 def test_bisection():
@@ -7,16 +8,65 @@ def test_bisection():
     def f(x): return x - 2
     a, b = 1, 3
     epsilon = 1e-6
-    root = om.bisection(f, a, b, epsilon)
+    result = om.bisection(f, a, b, epsilon)
+    root, _ = result
+    assert result.status == 'converged' and abs(root - 2) <= epsilon
+    assert om.bisection(f, 3, 4, epsilon).status == 'no sign change'
+    assert om.bisection(lambda x: x - math.pi, a, 4, epsilon, max_iterations=5).status == 'iteration limit'
     print(
-        f"Test - Root: {root}")
+        f"Test - Root: {root}, iterations: {result.iterations}")
+
+def test_bisection_batch():
+    # Test: f_i(x) = x^3 - p_i, interval [0, 3], bisection and Illinois
+    # steps; Illinois needs fewer evaluations on every problem
+    p = np.array([1, 8, 20])
+    a, b = 0, 3
+    epsilon = 1e-10
+    iterations, calls = {}, {}
+    for method in ('bisection', 'illinois'):
+        calls[method] = 0
+        def f(x):
+            calls[method] += 1
+            return x**3 - p
+        roots, iterations[method] = om.bisection_batch(f, a, b, epsilon, method=method)
+        assert np.allclose(roots, np.cbrt(p), atol=1e-8)
+    assert np.all(iterations['illinois'] < iterations['bisection'])
+    assert calls['illinois'] < calls['bisection']
+    print(
+        f"Test - Roots: {roots}, iterations: {iterations}")
 
 def test_golden_section():
     # Test: f(x) = (x - 2)^2 + 3, interval [0, 5]
     def f(x): return (x - 2)**2 + 3
     a, b = 0, 5
     epsilon = 1e-6
-    x_min, f_min = om.golden_section(f, a, b, epsilon)
+    result = om.golden_section(f, a, b, epsilon)
+    x_min, f_min = result
+    assert result and abs(x_min - 2) <= epsilon
+    # No interval of floats around 2 is narrower than zero
+    assert om.golden_section(f, a, b, 0).status == 'iteration limit'
+    print(
+        f"Test - x_min: {x_min}, f_min: {f_min}, iterations: {result.iterations}")
+
+def test_golden_section_batch():
+    # Test: f_i(x) = (x - c_i)^2, intervals [0, b_i]; every call of f gets
+    # one point per problem and comes once per iteration (plus the two
+    # starting points and the final value)
+    c = np.array([0.5, 1, 2, 3.5])
+    calls = []
+    def f(x):
+        calls.append(np.shape(x))
+        return (x - c)**2
+    a, b = 0, np.array([1, 5, 5, 10])
+    epsilon = 1e-6
+    records = []
+    x_min, f_min = om.golden_section_batch(f, a, b, epsilon, observer=records.append)
+    assert all(shape == c.shape for shape in calls)
+    assert len(calls) == len(records) + 3
+    for k in range(c.size):
+        x_k, _ = om.golden_section(lambda x: (x - c[k])**2, a, b[k], epsilon)
+        assert abs(x_min[k] - x_k) <= epsilon
+    assert np.allclose(x_min, c, atol=epsilon)
     print(
         f"Test - x_min: {x_min}, f_min: {f_min}")
 
@@ -27,15 +77,17 @@ def test_gradient_ascent():
     x0 = 0
     alpha = 0.1
     N = 100
-    x_max, f_max = om.gradient_ascent(f, df, x0, alpha, N)
+    x_max, f_max = om.gradient_ascent(df, f, x0, alpha, N)
     print(
         f"Test - x_max: {x_max}, f_max: {f_max}")
 
 def main():
     print("Running Bisection Method Tests:")
     test_bisection()
+    test_bisection_batch()
     print("\nRunning Golden Section Method Tests:")
     test_golden_section()
+    test_golden_section_batch()
     print("\nRunning Gradient Ascent Method Tests:")
     test_gradient_ascent()
 
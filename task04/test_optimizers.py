@@ -0,0 +1,58 @@
+import optimizers as op
+import numpy as np
+
+
+def rosenbrock(x): return np.sum(100*(x[1:] - x[:-1]**2)**2 + (1 - x[:-1])**2)
+
+def rosenbrock_gradient(x):
+    g = np.zeros_like(x)
+    g[:-1] = -400*x[:-1]*(x[1:] - x[:-1]**2) - 2*(1 - x[:-1])
+    g[1:] += 200*(x[1:] - x[:-1]**2)
+    return g
+
+def test_gradient_descent():
+    # Test: f(x) = sum(i x_i^2) / 2, x0 = (1, ..., 1), Wolfe line search
+    weights = np.arange(1, 6)
+    def f(x): return np.sum(weights * x**2) / 2
+    def df(x): return weights * x
+    x_min, f_min, iterations = op.gradient_descent(df, f, np.ones(5), search='wolfe')
+    assert np.allclose(x_min, 0, atol=1e-6) and iterations < 1000
+    print(
+        f"Test - x_min: {x_min}, f_min: {f_min}, iterations: {iterations}")
+
+def test_nesterov():
+    # Test: f(x) = -x^2 + 4x + 1 maximized, x0 = 0
+    def f(x): return -x**2 + 4*x + 1
+    def df(x): return -2*x + 4
+    x_max, f_max, iterations = op.nesterov(df, f, 0.0, alpha=0.1, is_max=True)
+    assert abs(x_max - 2) < 1e-5 and abs(f_max - 5) < 1e-9 and iterations < 1000
+    print(
+        f"Test - x_max: {x_max}, f_max: {f_max}, iterations: {iterations}")
+
+def test_adam():
+    # Test: Rosenbrock function in 5 dimensions, x0 = (-1, ..., -1)
+    x_min, f_min, iterations = op.adam(rosenbrock_gradient, rosenbrock, -np.ones(5), alpha=0.01)
+    assert np.allclose(x_min, 1, atol=1e-4) and iterations < 10000
+    print(
+        f"Test - x_min: {x_min}, f_min: {f_min}, iterations: {iterations}")
+
+def test_lbfgs():
+    # Test: Rosenbrock function in 10 dimensions, x0 = (-1, ..., -1)
+    x_min, f_min, iterations = op.lbfgs(rosenbrock_gradient, rosenbrock, -np.ones(10))
+    assert np.allclose(x_min, 1, atol=1e-6) and iterations < 1000
+    print(
+        f"Test - x_min: {x_min}, f_min: {f_min}, iterations: {iterations}")
+
+def main():
+    print("Running Gradient Descent Tests:")
+    test_gradient_descent()
+    print("\nRunning Nesterov Momentum Tests:")
+    test_nesterov()
+    print("\nRunning Adam Tests:")
+    test_adam()
+    print("\nRunning L-BFGS Tests:")
+    test_lbfgs()
+
+
+if __name__ == "__main__":
+    main()